@@ -1,26 +1,245 @@
 #!usr/bin/env python3
 
 import sqlite3
+import threading
+import time
+
+from sqlite_pool import apply_profile, check_profile, get_pool, pool_stats
 
 class DatabaseConnection:
-    def __init__(self, db_path):
+    """
+    Opens a connection for a with block, committing on success and rolling
+    back on error.
+
+    With pooled=True the connection is checked out of the per-path pool
+    in sqlite_pool and returned to it on exit instead of being closed, so
+    short transactions reuse a warm connection. pool_options (max_size,
+    timeout, idle_timeout, affinity) configure the pool when it is first
+    created.
+
+    profile names a set of PRAGMAs from sqlite_pool.PROFILES
+    ('read_heavy', 'bulk_load' or 'balanced') applied when the connection
+    is opened; None keeps the SQLite defaults.
+
+    check_same_thread is passed to sqlite3.connect for unpooled
+    connections; pooled connections may always be used from any thread.
+    """
+    def __init__(self, db_path, pooled=False, profile=None,
+                 check_same_thread=True, **pool_options):
         self.db_path = db_path
+        self.pooled = pooled
+        self.check_same_thread = check_same_thread
+        check_profile(profile)
+        self.profile = profile
+        self.pool_options = pool_options
         self.conn = None
+        self._pool = None
         
     def __enter__(self):
-        self.conn = sqlite3.connect(self.db_path)
+        if self.pooled:
+            self._pool = get_pool(self.db_path, self.profile,
+                                  **self.pool_options)
+            self.conn = self._pool.checkout()
+        else:
+            self.conn = sqlite3.connect(
+                self.db_path, check_same_thread=self.check_same_thread)
+            try:
+                apply_profile(self.conn, self.profile)
+            except BaseException:
+                self.conn.close()
+                raise
         return self.conn
     
     def __exit__(self, exc_type, exc_value, traceback):
         if self.conn:
-            if exc_type is not None:
-                self.conn.rollback()
-                print("Transaction rolled back due to an error")
+            try:
+                if exc_type is not None:
+                    self.conn.rollback()
+                    print("Transaction rolled back due to an error")
+                else:
+                    self.conn.commit()
+            finally:
+                if self.pooled:
+                    self._pool.release(self.conn)
+                    print("Database connection returned to pool.")
+                else:
+                    self.conn.close()
+                    print("Database connection closed.")
+                self.conn = None
+
+
+class WriteStats:
+    """
+    Counters describing the transactions committed by a BatchWriter.
+
+    Attributes:
+        commits (int): Transactions committed
+        rows (int): Rows written by those transactions
+        commit_time (float): Total seconds spent in executemany + commit
+        max_commit_latency (float): Slowest single flush, in seconds
+    """
+    def __init__(self):
+        self.commits = 0
+        self.rows = 0
+        self.commit_time = 0.0
+        self.max_commit_latency = 0.0
+
+    @property
+    def rows_per_commit(self):
+        """float: Mean rows grouped into one transaction"""
+        return self.rows / self.commits if self.commits else 0.0
+
+    @property
+    def average_commit_latency(self):
+        """float: Mean seconds per flush"""
+        return self.commit_time / self.commits if self.commits else 0.0
+
+    def as_dict(self):
+        """Returns the counters as a plain dictionary"""
+        return {
+            'commits': self.commits,
+            'rows': self.rows,
+            'rows_per_commit': self.rows_per_commit,
+            'commit_time': self.commit_time,
+            'average_commit_latency': self.average_commit_latency,
+            'max_commit_latency': self.max_commit_latency,
+        }
+
+
+class BatchWriter:
+    """
+    Buffers rows for one write statement and writes them in batches over
+    a single DatabaseConnection.
+
+    Each flush runs executemany() over the buffered rows and commits once,
+    so many small logical writes share one transaction and one sync to
+    disk. A flush happens when batch_size rows are buffered, when the
+    oldest buffered row is flush_interval seconds old, and when the with
+    block ends. The interval is enforced by a background thread, so rows
+    are committed on time even if no further write arrives; None turns it
+    off. An error raised by a background flush is re-raised by the next
+    write(), flush() or the end of the block. Rows of batches already
+    flushed stay committed if the block fails; rows still buffered are
+    discarded.
+
+    Usage:
+        with BatchWriter("users.db",
+                         "INSERT INTO users (name) VALUES (?)",
+                         batch_size=500) as writer:
+            for name in names:
+                writer.write((name,))
+        print(writer.stats.as_dict())
+    """
+    def __init__(self, db_path, query, batch_size=1000, flush_interval=1.0,
+                 pooled=False, profile=None, **pool_options):
+        self.query = query
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = WriteStats()
+        # The background flusher uses the connection from its own thread
+        self.database = DatabaseConnection(db_path, pooled=pooled,
+                                           profile=profile,
+                                           check_same_thread=False,
+                                           **pool_options)
+        self.conn = None
+        self._buffer = []
+        self._first_buffered = None
+        self._error = None
+        self._closing = False
+        self._flusher = None
+        self._condition = threading.Condition(threading.RLock())
+
+    def __enter__(self):
+        self.conn = self.database.__enter__()
+        self._closing = False
+        if self.flush_interval is not None:
+            self._flusher = threading.Thread(target=self._run_flusher,
+                                             name='batch-writer-flush',
+                                             daemon=True)
+            self._flusher.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            with self._condition:
+                self._closing = True
+                self._condition.notify()
+            if self._flusher is not None:
+                self._flusher.join()
+                self._flusher = None
+            if exc_type is None:
+                self.flush()
             else:
-                self.conn.commit()
-            self.conn.close()
-            print("Database connection closed.")
-    
+                self._buffer = []
+        finally:
+            self.conn = None
+            self.database.__exit__(exc_type, exc_value, traceback)
+
+    def _run_flusher(self):
+        """Flushes the buffer once its oldest row is flush_interval old"""
+        with self._condition:
+            while not self._closing:
+                if not self._buffer or self._error is not None:
+                    self._condition.wait()
+                    continue
+                remaining = (self._first_buffered + self.flush_interval
+                             - time.monotonic())
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                try:
+                    self._flush()
+                except sqlite3.Error as e:
+                    self._error = e
+
+    def _raise_background_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def write(self, params):
+        """Buffers one row of parameters, flushing if a threshold is hit"""
+        with self._condition:
+            self._raise_background_error()
+            if not self._buffer:
+                self._first_buffered = time.monotonic()
+                self._condition.notify()
+            self._buffer.append(params)
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def write_many(self, rows):
+        """Buffers every row of parameters in rows"""
+        for params in rows:
+            self.write(params)
+
+    def flush(self):
+        """Writes the buffered rows in one transaction"""
+        with self._condition:
+            self._raise_background_error()
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        if self.conn is None:
+            raise sqlite3.ProgrammingError("BatchWriter used outside 'with'")
+        rows, self._buffer = self._buffer, []
+        start = time.perf_counter()
+        try:
+            self.conn.executemany(self.query, rows)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        latency = time.perf_counter() - start
+        self.stats.commits += 1
+        self.stats.rows += len(rows)
+        self.stats.commit_time += latency
+        self.stats.max_commit_latency = max(self.stats.max_commit_latency,
+                                            latency)
+
+
 def main():
         try:
             
@@ -28,8 +247,12 @@ def main():
                 cursor = conn.cursor()
                 cursor.execute("DROP TABLE IF EXISTS users")
                 cursor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
-                cursor.execute("INSERT INTO users (name) VALUES ('Alice')")
-                cursor.execute("INSERT INTO users (name) VALUES ('Bob')")
+
+            # Rows are buffered and written with executemany in one transaction
+            with BatchWriter("test.db",
+                             "INSERT INTO users (name) VALUES (?)") as writer:
+                writer.write_many([('Alice',), ('Bob',)])
+            print(f"Write stats: {writer.stats.as_dict()}")
             
             with DatabaseConnection("test.db") as db_conn:
                 cursor = db_conn.cursor()
@@ -38,6 +261,12 @@ def main():
                 print("\nQuery results:")
                 for row in results:
                     print(row)
+
+            # Repeated short transactions reuse one warm pooled connection
+            for _ in range(3):
+                with DatabaseConnection("test.db", pooled=True) as db_conn:
+                    db_conn.execute("SELECT COUNT(*) FROM users").fetchone()
+            print(f"Pool stats: {pool_stats('test.db')}")
         except Exception as e:
             print(f"An error occurred: {e}")
 if __name__ == "__main__":
@@ -5,34 +5,124 @@ A class-based context manager to execute a database query.
 
 import sqlite3
 
+from sqlite_pool import apply_profile, check_profile, get_pool, pool_stats
+
+STREAM_MODES = ('rows', 'batches', 'columns')
+
+
+def iter_rows(cursor):
+    """
+    Yields the rows of an executed cursor one at a time.
+    SQLite steps through the result as rows are requested, so nothing is
+    read ahead of the consumer.
+    """
+    yield from cursor
+
+
+def iter_batches(cursor, batch_size):
+    """
+    Yields lists of up to batch_size rows fetched with fetchmany().
+    """
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def iter_columns(cursor, batch_size):
+    """
+    Yields batches of up to batch_size rows as {column name: values}
+    dictionaries, one list per column.
+    """
+    if cursor.description is None:
+        raise ValueError("Columnar streaming needs a query that returns rows")
+    names = [column[0] for column in cursor.description]
+    for rows in iter_batches(cursor, batch_size):
+        yield dict(zip(names, map(list, zip(*rows))))
+
+
 class ExecuteQuery:
     """
     A context manager to handle database connection and query execution.
+
+    The connection comes from the per-path pool in sqlite_pool and goes
+    back to it on exit. A reused connection still holds sqlite3's cache of
+    compiled statements, so running the same query again with different
+    params skips parsing and planning; sqlite_pool.pool_stats() reports
+    how often a warm connection was reused. pooled=False opens and closes
+    a connection of its own instead.
+
+    By default the 'with' statement gives the executed cursor. With stream
+    set it gives an iterator over the result instead, read as the
+    consumer goes so memory stays bounded for large SELECTs:
+        'rows': one row at a time
+        'batches': lists of up to batch_size rows (fetchmany)
+        'columns': {column name: values} dictionaries of up to
+            batch_size rows
+
+    profile names a set of PRAGMAs from sqlite_pool.PROFILES applied when
+    the connection is opened, e.g. 'read_heavy' for SELECTs.
     """
-    def __init__(self, db_path, query, params=None):
+    def __init__(self, db_path, query, params=None, pooled=True,
+                 stream=None, batch_size=1000, profile=None, **pool_options):
         """
         Initializes the context manager with the database path, query, and parameters.
+        pool_options (max_size, timeout, idle_timeout, affinity,
+        cached_statements) configure the pool when it is first created.
         """
+        if stream is not None and stream not in STREAM_MODES:
+            raise ValueError(f"stream must be one of {STREAM_MODES}")
         self.db_path = db_path
         self.query = query
         self.params = params if params is not None else ()
+        self.pooled = pooled
+        self.stream = stream
+        self.batch_size = batch_size
+        check_profile(profile)
+        self.profile = profile
+        self._pool = None
+        self.pool_options = pool_options
         self.conn = None
         self.cursor = None
 
+    def _release(self):
+        """
+        Returns the connection to the pool, or closes it when not pooled.
+        """
+        if self.pooled:
+            self._pool.release(self.conn)
+        else:
+            self.conn.close()
+        self.conn = None
+
     def __enter__(self):
         """
         Opens the database connection, creates a cursor, and executes the query.
         Returns the cursor object to be used in the 'with' statement.
         """
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            if self.pooled:
+                self._pool = get_pool(self.db_path, self.profile,
+                                      **self.pool_options)
+                self.conn = self._pool.checkout()
+            else:
+                self.conn = sqlite3.connect(self.db_path)
+                apply_profile(self.conn, self.profile)
             self.cursor = self.conn.cursor()
+            self.cursor.arraysize = self.batch_size
             self.cursor.execute(self.query, self.params)
+            if self.stream == 'rows':
+                return iter_rows(self.cursor)
+            if self.stream == 'batches':
+                return iter_batches(self.cursor, self.batch_size)
+            if self.stream == 'columns':
+                return iter_columns(self.cursor, self.batch_size)
             return self.cursor
         except sqlite3.Error as e:
             print(f"Database error during entry: {e}")
             if self.conn:
-                self.conn.close()
+                self._release()
             # Re-raise the exception to propagate it
             raise
 
@@ -42,15 +132,38 @@ class ExecuteQuery:
         Commits changes if no exception occurred.
         """
         if self.conn:
-            if exc_type:
-                # Rollback changes if an exception occurred in the 'with' block
-                self.conn.rollback()
-                print("Transaction rolled back due to an error.")
-            else:
-                # Commit changes if the 'with' block completed successfully
-                self.conn.commit()
-            self.conn.close()
-            print("Database connection closed.")
+            try:
+                # A consumer that stops iterating early is not an error
+                if exc_type and not issubclass(exc_type, GeneratorExit):
+                    # Rollback changes if the 'with' block raised
+                    self.conn.rollback()
+                    print("Transaction rolled back due to an error.")
+                else:
+                    # Commit changes if the 'with' block completed successfully
+                    self.conn.commit()
+            finally:
+                self.cursor.close()
+                pooled = self.pooled
+                self._release()
+                if pooled:
+                    print("Database connection returned to pool.")
+                else:
+                    print("Database connection closed.")
+
+def stream_query(db_path, query, params=None, stream='rows',
+                 batch_size=1000, pooled=True, profile=None):
+    """
+    Generator over the result of query in one of the STREAM_MODES.
+
+    The connection is checked out when iteration starts and returned to
+    the pool (or closed, with pooled=False) as soon as the result is
+    exhausted or the generator is closed, so it is held exactly while the
+    consumer is iterating.
+    """
+    with ExecuteQuery(db_path, query, params, pooled=pooled, stream=stream,
+                      batch_size=batch_size, profile=profile) as results:
+        yield from results
+
 
 def main():
     """
@@ -90,5 +203,17 @@ def main():
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+    # Repeated parameterized queries reuse the warm pooled connection and
+    # its compiled statement instead of parsing the query again
+    for age_param in (20, 25, 30):
+        with ExecuteQuery(db_name, query, (age_param,)) as cursor:
+            print(f"Users older than {age_param}: {len(cursor.fetchall())}")
+    print(f"Pool: {pool_stats(db_name)}")
+
+    # Stream the result in batches instead of materializing it
+    for columns in stream_query(db_name, "SELECT name, age FROM users",
+                                stream='columns', batch_size=2):
+        print(f"Column batch: {columns}")
+
 if __name__ == "__main__":
     main()
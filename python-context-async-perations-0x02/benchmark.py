@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Compares the SQLite performance profiles on the users table from
+1-execute.py.
+
+For each profile a fresh database is loaded with BatchWriter, then
+reader threads run parameterized SELECTs through pooled ExecuteQuery
+while one writer thread inserts small transactions:
+
+    python3 benchmark.py --rows 200000 --readers 4 --seconds 3
+
+The scratch databases go in --dir, which should be on the disk the real
+databases use so sync costs are representative.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+
+import sqlite_pool
+
+database_connection = __import__('0-databaseconnection')
+execute = __import__('1-execute')
+
+SCHEMA = "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)"
+INDEX = "CREATE INDEX idx_users_age ON users (age)"
+INSERT = "INSERT INTO users (name, age) VALUES (?, ?)"
+SELECT = "SELECT * FROM users WHERE age = ? LIMIT 100"
+
+# Profiles compared, with the profile used for the concurrent writer:
+# read_heavy connections are query_only, so its writer runs as balanced
+PROFILES = [
+    (None, None),
+    ('balanced', 'balanced'),
+    ('read_heavy', 'balanced'),
+    ('bulk_load', 'bulk_load'),
+]
+
+
+def _quiet():
+    """Silences the connection messages printed by the context managers"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def load(db_path, profile, rows, batch_size):
+    """Creates the users table and loads rows; returns rows per second"""
+    with _quiet(), database_connection.DatabaseConnection(db_path) as conn:
+        conn.execute(SCHEMA)
+        conn.execute(INDEX)
+    start = time.perf_counter()
+    with _quiet(), database_connection.BatchWriter(
+            db_path, INSERT, batch_size=batch_size, flush_interval=60,
+            profile=profile) as writer:
+        with sqlite_pool.deferred_indexes(writer.conn, 'users'):
+            writer.write_many((f"user{i}", i % 90) for i in range(rows))
+            writer.flush()
+    return rows / (time.perf_counter() - start)
+
+
+def mixed(db_path, read_profile, write_profile, readers, seconds):
+    """
+    Runs reader threads and one writer thread for seconds.
+
+    Returns:
+        tuple: (reads per second, writes per second)
+    """
+    stop = threading.Event()
+    counts = {'reads': 0, 'writes': 0}
+    lock = threading.Lock()
+
+    def read():
+        done = 0
+        age = 0
+        while not stop.is_set():
+            with execute.ExecuteQuery(db_path, SELECT, (age,),
+                                      profile=read_profile) as cursor:
+                cursor.fetchall()
+            age = (age + 1) % 90
+            done += 1
+        with lock:
+            counts['reads'] += done
+
+    def write():
+        done = 0
+        with database_connection.BatchWriter(
+                db_path, INSERT, batch_size=10, flush_interval=60,
+                pooled=True, profile=write_profile) as writer:
+            while not stop.is_set():
+                writer.write(("writer", done % 90))
+                done += 1
+        with lock:
+            counts['writes'] += done
+
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    threads.append(threading.Thread(target=write))
+    with _quiet():
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return counts['reads'] / seconds, counts['writes'] / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--dir', default='.',
+                        help='directory for the scratch databases')
+    args = parser.parse_args()
+
+    print(f"{'profile':<12} {'load rows/s':>14} {'reads/s':>10} "
+          f"{'writes/s':>10}")
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for read_profile, write_profile in PROFILES:
+            db_path = os.path.join(directory,
+                                   f"{read_profile or 'default'}.db")
+            loaded = load(db_path, write_profile, args.rows,
+                          args.batch_size)
+            reads, writes = mixed(db_path, read_profile, write_profile,
+                                  args.readers, args.seconds)
+            sqlite_pool.close_pools()
+            print(f"{read_profile or 'default':<12} {loaded:>14,.0f} "
+                  f"{reads:>10,.0f} {writes:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
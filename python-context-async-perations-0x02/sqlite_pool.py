@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+A pool of warm sqlite3 connections, one pool per database path, and the
+named performance profiles applied to connections when they are opened.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# PRAGMA settings applied on connect, by profile name. None keeps the
+# SQLite defaults (rollback journal, synchronous=FULL, 2 MiB cache).
+PROFILES = {
+    # Concurrent readers with an occasional writer
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16384,        # 16 MiB
+        'temp_store': 'MEMORY',
+    },
+    # Read-only connections: memory-mapped I/O and a large page cache
+    'read_heavy': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,        # 64 MiB
+        'mmap_size': 268435456,      # 256 MiB
+        'temp_store': 'MEMORY',
+        'query_only': 'ON',
+    },
+    # One-off loads where a crash means reloading: no syncs, journal kept
+    # in memory. Combine with deferred_indexes() for large loads.
+    'bulk_load': {
+        'journal_mode': 'MEMORY',
+        'synchronous': 'OFF',
+        'cache_size': -262144,       # 256 MiB
+        'temp_store': 'MEMORY',
+    },
+}
+
+
+def check_profile(profile):
+    """Raises ValueError unless profile is None or a key of PROFILES"""
+    if profile is not None and profile not in PROFILES:
+        raise ValueError(f"profile must be one of {sorted(PROFILES)}")
+
+
+def apply_profile(connection, profile):
+    """
+    Applies the PRAGMAs of a named profile to an open connection.
+
+    The journal mode is a property of the database file. Leaving WAL mode
+    needs the only connection to the file, so if other connections are
+    open the current journal mode is kept and the remaining PRAGMAs are
+    still applied.
+
+    Args:
+        connection (sqlite3.Connection): Connection to configure
+        profile (str): A key of PROFILES, or None for SQLite defaults
+    """
+    check_profile(profile)
+    if profile is None:
+        return
+    for pragma, value in PROFILES[profile].items():
+        try:
+            connection.execute(f"PRAGMA {pragma} = {value}")
+        except sqlite3.OperationalError:
+            if pragma != 'journal_mode':
+                raise
+
+
+@contextmanager
+def deferred_indexes(connection, table):
+    """
+    Drops the indexes of table for the duration of a bulk load and
+    recreates them afterwards, so each index is built once in sorted
+    order instead of being updated row by row.
+
+    UNIQUE indexes are left in place, since dropping them would let the
+    load insert duplicates the rebuild then fails on. Each index is
+    recreated on its own; if any cannot be, the others are still
+    rebuilt and an OperationalError naming the missing ones is raised.
+
+    Args:
+        connection (sqlite3.Connection): Connection doing the load
+        table (str): Table being loaded
+    """
+    names = [name for _, name, unique, origin, _ in connection.execute(
+        "SELECT * FROM pragma_index_list(?)", (table,))
+        if not unique and origin == 'c']
+    indexes = [connection.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+        "AND name = ?", (name,)).fetchone() for name in names]
+    for name, _ in indexes:
+        connection.execute(f'DROP INDEX "{name}"')
+    connection.commit()
+    failures = []
+    try:
+        yield connection
+    finally:
+        for name, sql in indexes:
+            try:
+                connection.execute(sql)
+            except sqlite3.Error as e:
+                failures.append((name, e))
+        connection.commit()
+    if failures:
+        missing = ', '.join(name for name, _ in failures)
+        raise sqlite3.OperationalError(
+            f"Could not recreate indexes on {table}: {missing}") \
+            from failures[0][1]
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no connection becomes available within the pool timeout"""
+
+
+class PoolStats:
+    """
+    Counters describing how a pool has been used.
+
+    Attributes:
+        checkouts (int): Connections handed out
+        reuses (int): Checkouts served by an idle pooled connection
+        opened (int): Connections opened by the pool
+        evictions (int): Idle connections closed by the pool
+        wait_time (float): Total seconds spent waiting for a connection
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.reuses = 0
+        self.opened = 0
+        self.evictions = 0
+        self.wait_time = 0.0
+
+    @property
+    def reuse_rate(self):
+        """float: Fraction of checkouts served by a warm connection"""
+        return self.reuses / self.checkouts if self.checkouts else 0.0
+
+    @property
+    def average_wait(self):
+        """float: Mean seconds a checkout waited for a connection"""
+        return self.wait_time / self.checkouts if self.checkouts else 0.0
+
+    def as_dict(self):
+        """Returns the counters as a plain dictionary"""
+        return {
+            'checkouts': self.checkouts,
+            'reuses': self.reuses,
+            'reuse_rate': self.reuse_rate,
+            'opened': self.opened,
+            'evictions': self.evictions,
+            'wait_time': self.wait_time,
+            'average_wait': self.average_wait,
+        }
+
+
+class SQLitePool:
+    """
+    Keeps up to max_size open connections to one SQLite database.
+
+    A connection returned to the pool keeps its parsed schema, page cache
+    and sqlite3's per-connection cache of compiled statements, so the next
+    checkout skips all of that.
+
+    Thread affinity:
+        'thread' (default): a connection is only handed back to the thread
+            that opened it, matching sqlite3's one-thread-per-connection
+            default. Idle connections of other threads are closed to make
+            room when the pool is full.
+        'any': any thread may reuse any idle connection.
+
+    Connections are opened with check_same_thread=False so the pool can
+    close them from any thread; a connection is still only used by one
+    thread at a time.
+    """
+
+    AFFINITIES = ('thread', 'any')
+
+    def __init__(self, db_path, max_size=5, timeout=30.0, idle_timeout=300.0,
+                 affinity='thread', cached_statements=128, profile=None):
+        """
+        Initializes an empty pool; connections are opened on demand.
+
+        Args:
+            db_path (str): Path of the SQLite database file
+            max_size (int): Maximum open connections, idle or checked out
+            timeout (float): Seconds checkout() waits when the pool is full
+            idle_timeout (float): Seconds before an idle connection is closed
+            affinity (str): 'thread' or 'any', see the class docstring
+            cached_statements (int): Compiled statements sqlite3 keeps per
+                connection; 128 is sqlite3's own default
+            profile (str): PROFILES entry applied to each new connection
+        """
+        if affinity not in self.AFFINITIES:
+            raise ValueError(f"affinity must be one of {self.AFFINITIES}")
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.affinity = affinity
+        self.cached_statements = cached_statements
+        self.profile = profile
+        self.stats = PoolStats()
+        self._idle = {}     # owner -> [(connection, last_used), ...]
+        self._size = 0
+        self._closed = False
+        self._lock = threading.Condition()
+
+    def _owner(self):
+        if self.affinity == 'thread':
+            return threading.get_ident()
+        return None
+
+    def _connect(self):
+        """Opens a new connection; hook for subclasses to configure it"""
+        connection = sqlite3.connect(
+            self.db_path, check_same_thread=False,
+            cached_statements=self.cached_statements)
+        try:
+            apply_profile(connection, self.profile)
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def _close(self, connection):
+        self._size -= 1
+        self._lock.notify()
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+
+    def _evict_expired(self, now):
+        for owner, idle in list(self._idle.items()):
+            while idle and now - idle[0][1] >= self.idle_timeout:
+                connection, _ = idle.pop(0)
+                self._close(connection)
+                self.stats.evictions += 1
+            if not idle:
+                del self._idle[owner]
+
+    def _evict_foreign(self, owner):
+        """Closes the least recently used idle connection of another owner"""
+        candidates = [(idle[0][1], key) for key, idle in self._idle.items()
+                      if key != owner and idle]
+        if not candidates:
+            return False
+        _, key = min(candidates)
+        connection, _ = self._idle[key].pop(0)
+        if not self._idle[key]:
+            del self._idle[key]
+        self._close(connection)
+        self.stats.evictions += 1
+        return True
+
+    def checkout(self):
+        """
+        Hands out an idle connection, or opens one if the pool has room.
+
+        Returns:
+            sqlite3.Connection: A connection for the caller's exclusive use
+
+        Raises:
+            PoolTimeoutError: If no connection frees up within timeout
+        """
+        owner = self._owner()
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Pool is closed")
+                now = time.monotonic()
+                self._evict_expired(now)
+                idle = self._idle.get(owner)
+                if idle:
+                    # Most recently used first: its pages are warmest
+                    connection, _ = idle.pop()
+                    self.stats.reuses += 1
+                    break
+                if self._size < self.max_size \
+                        or self._evict_foreign(owner):
+                    self._size += 1
+                    connection = None
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    self.stats.wait_time += now - start
+                    raise PoolTimeoutError(
+                        f"No connection to {self.db_path} available "
+                        f"within {self.timeout}s")
+                self._lock.wait(remaining)
+            self.stats.checkouts += 1
+            self.stats.wait_time += time.monotonic() - start
+
+        if connection is None:
+            try:
+                connection = self._connect()
+            except BaseException:
+                with self._lock:
+                    self._size -= 1
+                    self._lock.notify()
+                raise
+            with self._lock:
+                self.stats.opened += 1
+        return connection
+
+    def release(self, connection, discard=False):
+        """
+        Returns a checked-out connection to the pool.
+
+        Any open transaction is rolled back first, so the next user starts
+        clean. The caller is expected to have committed what it wanted.
+
+        Args:
+            connection (sqlite3.Connection): A connection from checkout()
+            discard (bool): Close the connection instead of keeping it
+        """
+        if not discard:
+            try:
+                if connection.in_transaction:
+                    connection.rollback()
+            except sqlite3.Error:
+                discard = True
+        with self._lock:
+            if discard or self._closed:
+                self._close(connection)
+                return
+            self._idle.setdefault(self._owner(), []).append(
+                (connection, time.monotonic()))
+            self._lock.notify()
+
+    def close(self):
+        """Closes every idle connection; checked-out ones close on release"""
+        with self._lock:
+            self._closed = True
+            for idle in self._idle.values():
+                for connection, _ in idle:
+                    self._close(connection)
+            self._idle.clear()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path, profile=None, **options):
+    """
+    Returns the pool for db_path and profile, creating it on first use.
+
+    Connections opened with different profiles behave differently, so
+    each (path, profile) pair gets its own pool. Options (max_size,
+    timeout, idle_timeout, affinity, cached_statements) only apply when
+    the pool is created.
+    """
+    check_profile(profile)
+    path = db_path if db_path == ':memory:' else os.path.abspath(db_path)
+    key = (path, profile)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SQLitePool(db_path, profile=profile,
+                                            **options)
+        return pool
+
+
+def pool_stats(db_path, profile=None):
+    """Returns the counters of the pool for db_path as a dictionary"""
+    return get_pool(db_path, profile).stats.as_dict()
+
+
+def close_pools():
+    """Closes and forgets every pool"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
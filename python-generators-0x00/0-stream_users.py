@@ -3,23 +3,56 @@
 Generator function to stream rows from the user_data table one by one
 """
 
-import seed
+import connection_pool
+from backends import Error
+from query_builder import USER_COLUMNS, build_select
+from rows import check_row_format, to_user_row
 
+DEFAULT_FETCH_SIZE = 1000
 
-def stream_users():
+
+def stream_users(fetch_size=DEFAULT_FETCH_SIZE, row_format='dict'):
     """
     Generator that streams rows from user_data table one by one.
     Uses yield to return one user at a time as a dictionary.
+
+    The cursor is explicitly unbuffered, so rows are read off the socket
+    fetch_size at a time and memory stays constant however large the
+    table is.
+
+    Args:
+        fetch_size (int): Number of rows pulled from the server per fetch
+        row_format (str): 'dict' for dictionaries, or 'row' for compact
+            rows.UserRow objects that still support user['age'] access
     """
-    connection = seed.connect_to_prodev()
+    check_row_format(row_format)
+    if row_format in ('columnar', 'arrays'):
+        raise ValueError("Use stream_users_in_batches for columnar batches")
+    compact = row_format != 'dict'
+
+    connection = connection_pool.connect_to_prodev()
     if connection:
+        cursor = None
         try:
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM user_data")
-            
-            for row in cursor:
-                yield row
-                
+            cursor = connection.cursor(dictionary=not compact,
+                                       buffered=False)
+            cursor.execute(build_select(USER_COLUMNS if compact else None)[0])
+
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                if compact:
+                    yield from map(to_user_row, rows)
+                else:
+                    yield from rows
+
         finally:
-            cursor.close()
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Error:
+                    # Stopped early with rows still unread; the pool
+                    # discards the connection instead of reusing it.
+                    pass
             connection.close()
@@ -3,44 +3,81 @@
 Generator functions for batch processing of user data
 """
 
-import seed
+import connection_pool
+from prefetch import prefetch
+from query_builder import USER_COLUMNS, build_select
+from rows import check_row_format, convert_batch
+from sinks import StdoutSink
 
 
-def stream_users_in_batches(batch_size):
+def stream_users_in_batches(batch_size, where=None, columns=None,
+                            row_format='dict', read_ahead=0):
     """
     Generator that fetches rows in batches from user_data table.
-    
+
+    Filtering and projection are pushed down into SQL so rows and columns
+    that are not needed never leave the server.
+
     Args:
         batch_size (int): Number of rows to fetch in each batch
-        
+        where: Predicate such as ('age', '>', 25) or a list of them,
+            see query_builder.compile_where
+        columns (sequence): Columns to fetch, or None for every column
+        row_format (str): 'dict' for lists of dictionaries, 'row' for
+            lists of compact rows.UserRow objects, 'columnar' for
+            rows.UserBatch column buffers, or 'arrays' for
+            rows.ColumnarBatch NumPy/array columns
+        read_ahead (int): Batches to fetch ahead on a background thread,
+            see prefetch.prefetch
+
     Yields:
         list: A batch of user records as dictionaries
     """
-    connection = seed.connect_to_prodev()
+    if read_ahead:
+        yield from prefetch(
+            stream_users_in_batches(batch_size, where, columns, row_format),
+            read_ahead)
+        return
+
+    check_row_format(row_format, columns)
+    compact = row_format != 'dict'
+    query, params = build_select(
+        columns=USER_COLUMNS if compact else columns, where=where)
+
+    connection = connection_pool.connect_to_prodev()
     if connection:
         try:
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM user_data")
-            
+            cursor = connection.cursor(dictionary=not compact)
+            cursor.execute(query, params)
+
             while True:
                 batch = cursor.fetchmany(batch_size)
                 if not batch:
                     break
+                if compact:
+                    batch = convert_batch(batch, row_format)
                 yield batch
-                
+
         finally:
             cursor.close()
             connection.close()
 
 
-def batch_processing(batch_size):
+def batch_processing(batch_size, sink=None):
     """
     Processes each batch to filter users over the age of 25.
-    
+
+    Matching rows are written through a buffered sink that is flushed
+    once per batch rather than printed one row at a time.
+
     Args:
         batch_size (int): Size of each batch to process
+        sink (sinks.Sink): Where to write matching users,
+            defaults to stdout in print() format
     """
-    for batch in stream_users_in_batches(batch_size):
-        for user in batch:
-            if user['age'] > 25:
-                print(user)
+    if sink is None:
+        sink = StdoutSink()
+    for batch in stream_users_in_batches(batch_size,
+                                         where=('age', '>', 25)):
+        sink.write_batch(batch)
+        sink.flush()
@@ -3,44 +3,208 @@
 Lazy pagination implementation using generators
 """
 
-import seed
+import base64
 
+import connection_pool
+import query_cache
+from prefetch import prefetch
 
-def paginate_users(page_size, offset):
+OFFSET_PAGE_QUERY = "SELECT * FROM user_data LIMIT %s OFFSET %s"
+KEYSET_PAGE_QUERY = (
+    "SELECT * FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s"
+)
+
+
+def _fetch_page(page_size, offset):
+    """Run OFFSET_PAGE_QUERY on a pooled connection"""
+    connection = connection_pool.connect_to_prodev()
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute(OFFSET_PAGE_QUERY, (page_size, offset))
+    rows = cursor.fetchall()
+    cursor.close()
+    connection.close()
+    return rows
+
+
+def paginate_users(page_size, offset, cached=True):
     """
     Fetch a page of users from the database.
-    
+
+    Pages are served from the shared query_cache when possible, so
+    repeatedly requested pages do not go back to the database until the
+    entry expires or seed.insert_data changes the table.
+
     Args:
         page_size (int): Number of users per page
         offset (int): Starting position in the dataset
-        
+        cached (bool): Use the query cache; False always queries
+
+    Returns:
+        list: List of user records for the page
+    """
+    if not cached:
+        return _fetch_page(page_size, offset)
+    rows = query_cache.cached_query(
+        OFFSET_PAGE_QUERY, (page_size, offset),
+        lambda: _fetch_page(page_size, offset))
+    # Copy so callers can modify their page without touching the cache
+    return [dict(row) for row in rows]
+
+
+def paginate_users_after(page_size, last_user_id=None):
+    """
+    Fetch the page of users that follows last_user_id in primary key order.
+
+    Seeks on the user_id primary key instead of skipping rows with OFFSET,
+    so every page costs the same regardless of how deep it is.
+
+    Args:
+        page_size (int): Number of users per page
+        last_user_id (str): user_id of the last row already seen,
+            or None to start from the beginning
+
     Returns:
         list: List of user records for the page
     """
-    connection = seed.connect_to_prodev()
+    connection = connection_pool.connect_to_prodev()
     cursor = connection.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM user_data LIMIT {page_size} OFFSET {offset}")
+    cursor.execute(KEYSET_PAGE_QUERY, (last_user_id or '', page_size))
     rows = cursor.fetchall()
+    cursor.close()
     connection.close()
     return rows
 
 
-def lazy_pagination(page_size):
+def encode_cursor(user_id):
+    """
+    Encode a user_id as an opaque, URL-safe cursor token.
+
+    Args:
+        user_id (str): user_id of the last row of a page
+
+    Returns:
+        str: Cursor token that can be passed back to keyset_pagination
+    """
+    return base64.urlsafe_b64encode(user_id.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor token produced by encode_cursor.
+
+    Args:
+        token (str): Cursor token
+
+    Returns:
+        str: The user_id the token points at
+    """
+    return base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8')
+
+
+def next_cursor(page):
+    """
+    Return the cursor token that resumes pagination after the given page.
+
+    Args:
+        page (list): A page yielded by keyset_pagination
+
+    Returns:
+        str: Cursor token, or None if the page is empty
+    """
+    if not page:
+        return None
+    return encode_cursor(page[-1]['user_id'])
+
+
+def _open_page_cursor():
+    """
+    Open the connection and prepared-statement cursor a paginating
+    generator holds for its whole lifetime.
+
+    Returns:
+        tuple: (connection, cursor)
+    """
+    connection = connection_pool.connect_to_prodev()
+    cursor = connection.cursor(prepared=True, dictionary=True)
+    return connection, cursor
+
+
+def keyset_pagination(page_size, cursor=None, read_ahead=0):
+    """
+    Generator that lazily pages through user_data using keyset pagination.
+    Yields the same page-shaped lists as lazy_pagination, but each page
+    is fetched with a primary key seek instead of LIMIT/OFFSET.
+
+    One connection and prepared statement are reused for every page and
+    released when the generator is exhausted, closed or garbage-collected.
+
+    Args:
+        page_size (int): Number of records per page
+        cursor (str): Token from next_cursor() to resume after a
+            previously yielded page, or None to start from the beginning
+        read_ahead (int): Pages to fetch ahead on a background thread,
+            see prefetch.prefetch
+
+    Yields:
+        list: A page of user records
+    """
+    if read_ahead:
+        yield from prefetch(keyset_pagination(page_size, cursor), read_ahead)
+        return
+
+    last_user_id = decode_cursor(cursor) if cursor else ''
+
+    connection, page_cursor = _open_page_cursor()
+    try:
+        while True:
+            page_cursor.execute(KEYSET_PAGE_QUERY, (last_user_id, page_size))
+            page = page_cursor.fetchall()
+            if not page:
+                break
+            yield page
+            last_user_id = page[-1]['user_id']
+    finally:
+        page_cursor.close()
+        connection.close()
+
+
+def lazy_pagination(page_size, keyset=False, read_ahead=0):
     """
     Generator that implements lazy loading of paginated data.
     Only fetches the next page when needed.
-    
+
+    One connection and prepared statement are reused for every page and
+    released when the generator is exhausted, closed or garbage-collected.
+
     Args:
         page_size (int): Number of records per page
-        
+        keyset (bool): Seek on user_id instead of using LIMIT/OFFSET,
+            see keyset_pagination
+        read_ahead (int): Pages to fetch ahead on a background thread,
+            see prefetch.prefetch
+
     Yields:
         list: A page of user records
     """
+    if read_ahead:
+        yield from prefetch(lazy_pagination(page_size, keyset), read_ahead)
+        return
+
+    if keyset:
+        yield from keyset_pagination(page_size)
+        return
+
     offset = 0
-    
-    while True:
-        page = paginate_users(page_size, offset)
-        if not page:
-            break
-        yield page
-        offset += page_size
+
+    connection, page_cursor = _open_page_cursor()
+    try:
+        while True:
+            page_cursor.execute(OFFSET_PAGE_QUERY, (page_size, offset))
+            page = page_cursor.fetchall()
+            if not page:
+                break
+            yield page
+            offset += page_size
+    finally:
+        page_cursor.close()
+        connection.close()
@@ -3,50 +3,211 @@
 Memory-efficient aggregation using generators to calculate average age
 """
 
-import seed
+import math
+from array import array
+from collections import Counter
+
+import connection_pool
+from backends import Error
+from streaming_stats import StreamingStatistics
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+DEFAULT_CHUNK_SIZE = 10000
 
 
 def stream_user_ages():
     """
     Generator that yields user ages one by one.
-    
+
     Yields:
         int: User age
     """
-    connection = seed.connect_to_prodev()
+    connection = connection_pool.connect_to_prodev()
     if connection:
         try:
             cursor = connection.cursor()
             cursor.execute("SELECT age FROM user_data")
-            
+
             for row in cursor:
                 yield row[0]
-                
+
         finally:
             cursor.close()
             connection.close()
 
 
+def _nearest_rank(count, percentile):
+    """1-based nearest-rank position of a percentile among count values"""
+    return max(1, math.ceil(percentile / 100 * count))
+
+
+def _summary(count, total, minimum, maximum, percentiles):
+    """Build the dictionary returned by aggregate_ages"""
+    return {
+        'count': count,
+        'sum': total,
+        'avg': total / count if count else 0,
+        'min': minimum,
+        'max': maximum,
+        'percentiles': percentiles,
+    }
+
+
+def _percentiles(frequencies, count, percentiles):
+    """
+    Nearest-rank percentiles from (age, count) pairs sorted by age, in a
+    single pass over them
+    """
+    ranks = sorted((_nearest_rank(count, p), p) for p in percentiles)
+    values = {}
+    seen = 0
+    position = 0
+    for age, frequency in frequencies:
+        seen += frequency
+        while position < len(ranks) and ranks[position][0] <= seen:
+            values[ranks[position][1]] = age
+            position += 1
+    return values
+
+
+def _aggregate_in_database(cursor, percentiles):
+    """
+    Compute the summary with SQL aggregates on the server.
+
+    Percentiles come from one GROUP BY age query read in age order, so
+    every requested percentile costs a single pass over the age index
+    (at most 1000 groups for DECIMAL(3,0)) rather than one sort each.
+    """
+    cursor.execute(
+        "SELECT COUNT(age), SUM(age), MIN(age), MAX(age) FROM user_data")
+    count, total, minimum, maximum = cursor.fetchone()
+    if not count:
+        return _summary(0, 0, None, None, {p: None for p in percentiles})
+
+    values = {}
+    if percentiles:
+        cursor.execute(
+            "SELECT age, COUNT(*) FROM user_data GROUP BY age ORDER BY age")
+        values = _percentiles(
+            ((int(age), frequency) for age, frequency in cursor.fetchall()),
+            count, percentiles)
+    return _summary(count, int(total), int(minimum), int(maximum), values)
+
+
+def _aggregate_streaming(cursor, percentiles, chunk_size):
+    """
+    Compute the summary by reducing fetchmany chunks on the client.
+
+    Each chunk is packed into a NumPy (or array module) buffer and reduced
+    in one go. Ages are whole numbers from DECIMAL(3,0), so a count per
+    distinct age is enough to answer percentiles exactly.
+    """
+    cursor.execute("SELECT age FROM user_data")
+    count = total = 0
+    minimum = maximum = None
+    frequencies = Counter()
+
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        if np is not None:
+            chunk = np.fromiter((row[0] for row in rows), dtype=np.int64,
+                                count=len(rows))
+            low, high = int(chunk.min()), int(chunk.max())
+            total += int(chunk.sum())
+            distinct, counts = np.unique(chunk, return_counts=True)
+            frequencies.update(dict(zip(distinct.tolist(), counts.tolist())))
+        else:
+            chunk = array('q', (int(row[0]) for row in rows))
+            low, high = min(chunk), max(chunk)
+            total += sum(chunk)
+            frequencies.update(chunk)
+        count += len(rows)
+        minimum = low if minimum is None else min(minimum, low)
+        maximum = high if maximum is None else max(maximum, high)
+
+    if not count:
+        return _summary(0, 0, None, None, {p: None for p in percentiles})
+
+    values = _percentiles(sorted(frequencies.items()), count, percentiles)
+    return _summary(count, total, minimum, maximum, values)
+
+
+def aggregate_ages(percentiles=(), server_side=None,
+                   chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Summarise user ages: count, sum, avg, min, max and percentiles.
+
+    Aggregates run inside the database when possible. If the backend
+    rejects the aggregate queries, or server_side is False, the same
+    summary is computed by a chunked streaming reduction instead. Both
+    paths return identical results; percentiles use the nearest-rank
+    definition.
+
+    Args:
+        percentiles (sequence): Percentiles to compute, e.g. (50, 90, 99)
+        server_side (bool): True to require SQL aggregates, False to
+            always stream, None to try SQL first and fall back
+        chunk_size (int): Rows per fetchmany on the streaming path
+
+    Returns:
+        dict: count, sum, avg, min, max and a percentiles mapping, or
+            None if the database cannot be reached
+    """
+    connection = connection_pool.connect_to_prodev()
+    if not connection:
+        return None
+    cursor = connection.cursor()
+    try:
+        if server_side is not False:
+            try:
+                return _aggregate_in_database(cursor, percentiles)
+            except Error:
+                if server_side:
+                    raise
+        return _aggregate_streaming(cursor, percentiles, chunk_size)
+    finally:
+        cursor.close()
+        connection.close()
+
+
 def calculate_average_age():
     """
-    Calculate the average age using the generator without loading
-    the entire dataset into memory.
-    
+    Calculate the average age without loading the entire dataset into
+    memory. The average is computed by the database when it can be,
+    falling back to a streaming reduction otherwise.
+
     Returns:
         float: Average age of users
     """
-    total_age = 0
-    count = 0
-    
+    summary = aggregate_ages()
+    return summary['avg'] if summary else 0
+
+
+def describe_ages(lower=0, upper=100, buckets=10,
+                  quantiles=(0.5, 0.9, 0.99)):
+    """
+    Compute mean, variance, min/max, a histogram and approximate quantiles
+    of user ages in a single pass over stream_user_ages().
+
+    Args:
+        lower (int): Lower bound of the histogram
+        upper (int): Upper bound of the histogram
+        buckets (int): Number of histogram buckets
+        quantiles (sequence): Quantiles in [0, 1] to estimate
+
+    Returns:
+        dict: See streaming_stats.StreamingStatistics.summary
+    """
+    stats = StreamingStatistics(lower, upper, buckets)
     for age in stream_user_ages():
-        total_age += age
-        count += 1
-    
-    if count == 0:
-        return 0
-    
-    average_age = total_age / count
-    return average_age
+        stats.update(int(age))
+    return stats.summary(quantiles)
 
 
 if __name__ == "__main__":
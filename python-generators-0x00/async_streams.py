@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Asyncio counterparts of the user_data generators.
+
+Usage:
+    async for user in astream_users():
+        ...
+
+The database is MySQL through aiomysql by default. Setting DB_BACKEND=sqlite
+reads from the SQLite file named by DB_PATH through aiosqlite instead,
+which is handy for tests. Each scan holds its own connection, so many
+scans can run concurrently on one event loop. Breaking out of a scan
+early closes its cursor before its connection; on MySQL the connection is
+dropped without draining the rest of the result.
+"""
+
+import os
+from contextlib import aclosing
+
+from dotenv import load_dotenv
+
+from backends import to_qmark
+from query_builder import build_select
+
+lazy_paginate = __import__('2-lazy_paginate')
+
+try:
+    import aiomysql
+except ImportError:  # pragma: no cover - only needed for DB_BACKEND=mysql
+    aiomysql = None
+
+try:
+    import aiosqlite
+except ImportError:  # pragma: no cover - only needed for DB_BACKEND=sqlite
+    aiosqlite = None
+
+load_dotenv()
+
+
+class _MySQLConnection:
+    """aiomysql connection read through unbuffered server-side cursors"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    @classmethod
+    async def open(cls):
+        connection = await aiomysql.connect(
+            host=os.getenv('DB_HOST', 'localhost'),
+            user=os.getenv('DB_USER', 'root'),
+            password=os.getenv('DB_PASSWORD', ''),
+            db=os.getenv('DB_NAME', 'ALX_prodev'),
+            autocommit=True,
+        )
+        return cls(connection)
+
+    async def batches(self, query, params, size, dictionary=True):
+        cursor_class = aiomysql.SSDictCursor if dictionary \
+            else aiomysql.SSCursor
+        cursor = await self._connection.cursor(cursor_class)
+        exhausted = False
+        try:
+            await cursor.execute(query, params)
+            while True:
+                rows = await cursor.fetchmany(size)
+                if not rows:
+                    break
+                yield list(rows)
+            exhausted = True
+        finally:
+            if exhausted:
+                await cursor.close()
+            else:
+                # Closing an unbuffered cursor reads every row still on the
+                # wire; drop the socket instead so an early exit is cheap.
+                self._connection.close()
+
+    async def fetchall(self, query, params, dictionary=True):
+        cursor_class = aiomysql.DictCursor if dictionary else aiomysql.Cursor
+        async with self._connection.cursor(cursor_class) as cursor:
+            await cursor.execute(query, params)
+            return list(await cursor.fetchall())
+
+    async def close(self):
+        self._connection.close()
+
+
+class _SQLiteConnection:
+    """aiosqlite connection; %s placeholders are rewritten by to_qmark"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    @classmethod
+    async def open(cls):
+        connection = await aiosqlite.connect(
+            os.getenv('DB_PATH', 'ALX_prodev.db'))
+        connection.row_factory = aiosqlite.Row
+        return cls(connection)
+
+    @staticmethod
+    def _convert(rows, dictionary):
+        return [dict(row) if dictionary else tuple(row) for row in rows]
+
+    async def batches(self, query, params, size, dictionary=True):
+        async with self._connection.execute(
+                to_qmark(query), params) as cursor:
+            while True:
+                rows = await cursor.fetchmany(size)
+                if not rows:
+                    break
+                yield self._convert(rows, dictionary)
+
+    async def fetchall(self, query, params, dictionary=True):
+        async with self._connection.execute(
+                to_qmark(query), params) as cursor:
+            return self._convert(await cursor.fetchall(), dictionary)
+
+    async def close(self):
+        await self._connection.close()
+
+
+async def aconnect_to_prodev():
+    """Opens an async connection to the ALX_prodev database"""
+    if os.getenv('DB_BACKEND', 'mysql') == 'sqlite':
+        return await _SQLiteConnection.open()
+    return await _MySQLConnection.open()
+
+
+async def astream_users_in_batches(batch_size, where=None, columns=None):
+    """
+    Async generator that fetches rows in batches from user_data table.
+    Same semantics as stream_users_in_batches, including the where and
+    columns pushdown.
+
+    Args:
+        batch_size (int): Number of rows to fetch in each batch
+        where: Predicate, see query_builder.compile_where
+        columns (sequence): Columns to fetch, or None for every column
+
+    Yields:
+        list: A batch of user records as dictionaries
+    """
+    query, params = build_select(columns=columns, where=where)
+    connection = await aconnect_to_prodev()
+    try:
+        async with aclosing(connection.batches(query, params,
+                                               batch_size)) as batches:
+            async for batch in batches:
+                yield batch
+    finally:
+        await connection.close()
+
+
+async def astream_users(fetch_size=1000):
+    """
+    Async generator that streams rows from user_data table one by one.
+
+    Args:
+        fetch_size (int): Number of rows pulled from the server per fetch
+
+    Yields:
+        dict: A user record
+    """
+    async with aclosing(astream_users_in_batches(fetch_size)) as batches:
+        async for batch in batches:
+            for row in batch:
+                yield row
+
+
+async def apaginate_users(page_size, offset):
+    """
+    Fetch a page of users from the database.
+
+    Args:
+        page_size (int): Number of users per page
+        offset (int): Starting position in the dataset
+
+    Returns:
+        list: List of user records for the page
+    """
+    connection = await aconnect_to_prodev()
+    try:
+        return await connection.fetchall(lazy_paginate.OFFSET_PAGE_QUERY,
+                                         (page_size, offset))
+    finally:
+        await connection.close()
+
+
+async def alazy_pagination(page_size, keyset=False):
+    """
+    Async generator that lazily fetches one page at a time over a single
+    connection. Same semantics as lazy_pagination.
+
+    Args:
+        page_size (int): Number of records per page
+        keyset (bool): Seek on user_id instead of using LIMIT/OFFSET
+
+    Yields:
+        list: A page of user records
+    """
+    connection = await aconnect_to_prodev()
+    try:
+        last_user_id = ''
+        offset = 0
+        while True:
+            if keyset:
+                page = await connection.fetchall(
+                    lazy_paginate.KEYSET_PAGE_QUERY,
+                    (last_user_id, page_size))
+            else:
+                page = await connection.fetchall(
+                    lazy_paginate.OFFSET_PAGE_QUERY, (page_size, offset))
+            if not page:
+                break
+            yield page
+            last_user_id = page[-1]['user_id']
+            offset += page_size
+    finally:
+        await connection.close()
+
+
+async def astream_user_ages(fetch_size=1000):
+    """
+    Async generator that yields user ages one by one.
+
+    Yields:
+        int: User age
+    """
+    query, params = build_select(columns=('age',))
+    connection = await aconnect_to_prodev()
+    try:
+        async with aclosing(connection.batches(
+                query, params, fetch_size, dictionary=False)) as batches:
+            async for rows in batches:
+                for row in rows:
+                    yield row[0]
+    finally:
+        await connection.close()
+
+
+async def acalculate_average_age():
+    """
+    Calculate the average age by streaming ages asynchronously.
+
+    Returns:
+        float: Average age of users
+    """
+    total_age = 0
+    count = 0
+    async for age in astream_user_ages():
+        total_age += age
+        count += 1
+    return total_age / count if count else 0
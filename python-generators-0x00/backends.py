@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Storage backends behind seed.connect_to_prodev, create_table and insert_data.
+
+DB_BACKEND selects the backend: 'mysql' (default) talks to the ALX_prodev
+MySQL database, 'sqlite' uses the embedded SQLite file named by DB_PATH.
+SQLite connections are wrapped to accept the mysql.connector calls the
+generator scripts make (cursor(dictionary=True), %s placeholders, Error),
+so the rest of the pipeline runs unchanged on either backend. The MySQL
+driver is only imported when a MySQL connection is opened, so the SQLite
+backend works without it; scripts import Error from here.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from functools import lru_cache
+
+try:
+    from mysql.connector import Error
+except ImportError:  # pragma: no cover - only needed for DB_BACKEND=mysql
+    class Error(Exception):
+        """Stand-in for mysql.connector.Error when the driver is missing"""
+
+        def __init__(self, msg=None, errno=None, sqlstate=None):
+            super().__init__(msg)
+            self.msg = msg
+            self.errno = errno
+            self.sqlstate = sqlstate
+
+USER_DATA_COLUMNS = """
+    user_id CHAR(36) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    age DECIMAL(3,0) NOT NULL
+"""
+
+# Secondary indexes on user_data, by name. The primary key already
+# indexes user_id. (age, user_id) serves the age filters and covers
+# SELECT age scans; its age prefix makes a separate age index redundant.
+INDEXES = {
+    'idx_age_user_id': ('age', 'user_id'),
+    'idx_email': ('email',),
+}
+
+# Indexes created by earlier versions that only slow down writes
+REDUNDANT_INDEXES = ('idx_user_id',)
+
+
+class Backend:
+    """
+    Interface implemented by every storage backend.
+
+    Attributes:
+        name (str): Value of DB_BACKEND selecting this backend
+        upsert_query (str): Insert-or-update statement for user_data rows
+        supports_load_data (bool): Whether LOAD DATA LOCAL INFILE works
+    """
+
+    name = None
+    upsert_query = None
+    supports_load_data = False
+
+    def connect_server(self):
+        """Connect without selecting the ALX_prodev database"""
+        raise NotImplementedError
+
+    def create_database(self, connection):
+        """Create the ALX_prodev database if it does not exist"""
+        raise NotImplementedError
+
+    def connect(self, allow_local_infile=False):
+        """Connect to the ALX_prodev database"""
+        raise NotImplementedError
+
+    def create_table(self, connection):
+        """Create the user_data table if it does not exist"""
+        raise NotImplementedError
+
+    def index_names(self, connection):
+        """Return the names of the secondary indexes on user_data"""
+        raise NotImplementedError
+
+    def create_index(self, connection, name, columns):
+        """Create the named index on user_data"""
+        cursor = connection.cursor()
+        cursor.execute(
+            f"CREATE INDEX {name} ON user_data ({', '.join(columns)})")
+        cursor.close()
+
+    def drop_index(self, connection, name):
+        """Drop the named index from user_data"""
+        raise NotImplementedError
+
+    def explain(self, connection, query, params=()):
+        """Return the query plan for query as a list of dictionaries"""
+        raise NotImplementedError
+
+    @contextmanager
+    def bulk_load(self, connection):
+        """Context in which the connection is tuned for a bulk insert"""
+        yield connection
+
+
+class MySQLBackend(Backend):
+    """The ALX_prodev database on a MySQL server"""
+
+    name = 'mysql'
+    supports_load_data = True
+    upsert_query = """
+    INSERT INTO user_data (user_id, name, email, age)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        name = VALUES(name), email = VALUES(email), age = VALUES(age)
+    """
+
+    def _options(self):
+        return {
+            'host': os.getenv('DB_HOST', 'localhost'),
+            'user': os.getenv('DB_USER', 'root'),
+            'password': os.getenv('DB_PASSWORD', ''),
+        }
+
+    def _connect(self, **options):
+        import mysql.connector
+        return mysql.connector.connect(**self._options(), **options)
+
+    def connect_server(self):
+        return self._connect()
+
+    def create_database(self, connection):
+        cursor = connection.cursor()
+        cursor.execute("CREATE DATABASE IF NOT EXISTS ALX_prodev")
+        cursor.close()
+
+    def connect(self, allow_local_infile=False):
+        return self._connect(
+            database=os.getenv('DB_NAME', 'ALX_prodev'),
+            allow_local_infile=allow_local_infile,
+        )
+
+    def create_table(self, connection):
+        cursor = connection.cursor()
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS user_data ({USER_DATA_COLUMNS})
+        """)
+        cursor.close()
+
+    def index_names(self, connection):
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SHOW INDEX FROM user_data")
+        names = {row['Key_name'] for row in cursor.fetchall()}
+        cursor.close()
+        names.discard('PRIMARY')
+        return names
+
+    def drop_index(self, connection, name):
+        cursor = connection.cursor()
+        cursor.execute(f"DROP INDEX {name} ON user_data")
+        cursor.close()
+
+    def explain(self, connection, query, params=()):
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(f"EXPLAIN {query}", params)
+        plan = cursor.fetchall()
+        cursor.close()
+        return plan
+
+
+# A quoted string or identifier, or a %s placeholder outside of one
+_PLACEHOLDER_TOKENS = re.compile(
+    r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|`[^`]*`|%s""")
+
+
+@lru_cache(maxsize=256)
+def to_qmark(query):
+    """
+    Rewrite the %s placeholders of query to SQLite's ?.
+
+    %s inside quoted literals, such as LIKE '%s%', is left alone.
+    """
+    return _PLACEHOLDER_TOKENS.sub(
+        lambda match: '?' if match.group() == '%s' else match.group(), query)
+
+
+def _md5(value):
+    """MD5() for SQLite, matching MySQL's lowercase hex digest"""
+    if value is None:
+        return None
+    return hashlib.md5(str(value).encode('utf-8')).hexdigest()
+
+
+def _concat_ws(separator, *values):
+    """CONCAT_WS() for SQLite, skipping NULLs like MySQL does"""
+    return separator.join(str(value) for value in values if value is not None)
+
+
+class SQLiteCursor:
+    """
+    A sqlite3 cursor that accepts mysql.connector-style calls.
+
+    %s placeholders are rewritten to ? (see to_qmark), dictionary cursors
+    return dicts, and sqlite3 errors are re-raised as Error so existing
+    error handling applies to both backends.
+    """
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        if dictionary:
+            self._cursor.row_factory = self._dict_row
+
+    @staticmethod
+    def _dict_row(cursor, row):
+        return {column[0]: value
+                for column, value in zip(cursor.description, row)}
+
+    def execute(self, query, params=()):
+        try:
+            self._cursor.execute(to_qmark(query), params or ())
+        except sqlite3.Error as e:
+            raise Error(msg=str(e)) from e
+        return self
+
+    def executemany(self, query, seq_of_params):
+        try:
+            self._cursor.executemany(to_qmark(query), seq_of_params)
+        except sqlite3.Error as e:
+            raise Error(msg=str(e)) from e
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """A sqlite3 connection exposing the mysql.connector calls we use"""
+
+    unread_result = False
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._closed = False
+
+    def cursor(self, dictionary=False, buffered=None, prepared=None):
+        """
+        Open a cursor. buffered and prepared are accepted for
+        compatibility: SQLite always steps rows lazily and caches
+        prepared statements per connection.
+        """
+        return SQLiteCursor(self._connection.cursor(), dictionary)
+
+    def execute(self, query, params=()):
+        return self.cursor().execute(query, params)
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def is_connected(self):
+        return not self._closed
+
+    def close(self):
+        self._closed = True
+        self._connection.close()
+
+
+class SQLiteBackend(Backend):
+    """
+    The user_data table in an embedded SQLite file.
+
+    Connections run in WAL mode with synchronous=NORMAL, a large page
+    cache and memory-mapped I/O for fast scans. Bulk loads temporarily
+    drop to synchronous=OFF.
+    """
+
+    name = 'sqlite'
+    upsert_query = """
+    INSERT INTO user_data (user_id, name, email, age)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT(user_id) DO UPDATE SET
+        name = excluded.name, email = excluded.email, age = excluded.age
+    """
+
+    PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'temp_store': 'MEMORY',
+        'cache_size': -65536,         # 64 MiB
+        'mmap_size': 268435456,       # 256 MiB
+    }
+    BULK_LOAD_PRAGMAS = {
+        'synchronous': 'OFF',
+        'cache_size': -262144,        # 256 MiB
+    }
+
+    def _path(self):
+        return os.getenv('DB_PATH', 'ALX_prodev.db')
+
+    def _set_pragmas(self, connection, pragmas):
+        for pragma, value in pragmas.items():
+            connection.execute(f"PRAGMA {pragma} = {value}")
+
+    def connect_server(self):
+        return self.connect()
+
+    def create_database(self, connection):
+        # The database file is created by connecting to it
+        pass
+
+    def connect(self, allow_local_infile=False):
+        try:
+            connection = sqlite3.connect(self._path(),
+                                         check_same_thread=False)
+        except sqlite3.Error as e:
+            raise Error(msg=str(e)) from e
+        connection.create_function('MD5', 1, _md5, deterministic=True)
+        connection.create_function('CONCAT_WS', -1, _concat_ws,
+                                   deterministic=True)
+        self._set_pragmas(connection, self.PRAGMAS)
+        return SQLiteConnection(connection)
+
+    def create_table(self, connection):
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS user_data ({USER_DATA_COLUMNS})"
+            " WITHOUT ROWID")
+        connection.commit()
+
+    def index_names(self, connection):
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("PRAGMA index_list(user_data)")
+        names = {row['name'] for row in cursor.fetchall()
+                 if row['origin'] == 'c'}
+        cursor.close()
+        return names
+
+    def drop_index(self, connection, name):
+        connection.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def explain(self, connection, query, params=()):
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        plan = [{'detail': row['detail']} for row in cursor.fetchall()]
+        cursor.close()
+        return plan
+
+    @contextmanager
+    def bulk_load(self, connection):
+        self._set_pragmas(connection, self.BULK_LOAD_PRAGMAS)
+        try:
+            yield connection
+        finally:
+            self._set_pragmas(connection, {
+                pragma: self.PRAGMAS[pragma]
+                for pragma in self.BULK_LOAD_PRAGMAS
+            })
+
+
+BACKENDS = {backend.name: backend for backend in (MySQLBackend, SQLiteBackend)}
+
+
+def get_backend():
+    """Return the backend selected by DB_BACKEND"""
+    name = os.getenv('DB_BACKEND', 'mysql')
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown DB_BACKEND {name!r}; "
+                         f"expected one of {sorted(BACKENDS)}") from None
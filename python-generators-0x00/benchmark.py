@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the user_data generators.
+
+Run against a seeded ALX_prodev database:
+
+    python3 benchmark.py pagination --page-size 100 --pages 500
+    python3 benchmark.py stream-memory --fetch-size 1000
+    python3 benchmark.py pushdown --min-age 25
+    python3 benchmark.py sinks --rows 1000000
+    python3 benchmark.py aggregate
+    python3 benchmark.py row-memory --rows 100000
+    python3 benchmark.py columnar --rows 1000000
+    python3 benchmark.py pipeline --rows 1000000
+"""
+
+import argparse
+import contextlib
+import os
+import resource
+import time
+import tracemalloc
+from decimal import Decimal
+
+import connection_pool
+import seed
+from pipeline import Pipeline
+import rows
+import sinks
+from query_builder import build_select
+
+stream_users = __import__('0-stream_users')
+lazy_paginate = __import__('2-lazy_paginate')
+stream_ages = __import__('4-stream_ages')
+
+
+def _timed(label, pages_iter, max_pages):
+    """Consume up to max_pages pages and print pages/sec."""
+    start = time.perf_counter()
+    pages = 0
+    rows = 0
+    for page in pages_iter:
+        pages += 1
+        rows += len(page)
+        if pages >= max_pages:
+            break
+    elapsed = time.perf_counter() - start
+    rate = pages / elapsed if elapsed else float('inf')
+    print(f"{label:<32} {pages:>6} pages {rows:>9} rows "
+          f"{elapsed:>8.3f}s {rate:>10.1f} pages/sec")
+
+
+def _connection_per_page(page_size):
+    """
+    Open and close a fresh connection for every page: the original
+    paginate_users, with no pool and no query cache.
+    """
+    offset = 0
+    while True:
+        connection = seed.connect_to_prodev()
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(lazy_paginate.OFFSET_PAGE_QUERY, (page_size, offset))
+        page = cursor.fetchall()
+        cursor.close()
+        connection.close()
+        if not page:
+            break
+        yield page
+        offset += page_size
+
+
+def _checkout_per_page(page_size):
+    """Check a pooled connection out for every page, bypassing the cache"""
+    offset = 0
+    while True:
+        page = lazy_paginate.paginate_users(page_size, offset, cached=False)
+        if not page:
+            break
+        yield page
+        offset += page_size
+
+
+def bench_pagination(args):
+    """Compare connection-per-page pagination with a held connection."""
+    _timed("connection per page", _connection_per_page(args.page_size),
+           args.pages)
+    _timed("pooled checkout per page", _checkout_per_page(args.page_size),
+           args.pages)
+    _timed("lazy_pagination (offset)",
+           lazy_paginate.lazy_pagination(args.page_size), args.pages)
+    _timed("lazy_pagination (keyset)",
+           lazy_paginate.lazy_pagination(args.page_size, keyset=True),
+           args.pages)
+    print(f"pool: {connection_pool.pool_stats()}")
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MiB (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_stream_memory(args):
+    """Report peak RSS at checkpoints while stream_users walks the table."""
+    start = time.perf_counter()
+    baseline = None
+    rows = 0
+    for _ in stream_users.stream_users(fetch_size=args.fetch_size):
+        rows += 1
+        if rows % args.every == 0:
+            peak = _peak_rss_mb()
+            if baseline is None:
+                baseline = peak
+            print(f"{rows:>12} rows  peak RSS {peak:8.1f} MiB "
+                  f"(+{peak - baseline:.1f})")
+        if args.rows and rows >= args.rows:
+            break
+    elapsed = time.perf_counter() - start
+    print(f"streamed {rows} rows in {elapsed:.3f}s, "
+          f"final peak RSS {_peak_rss_mb():.1f} MiB")
+
+
+def _bytes_sent(connection):
+    """Bytes the server has sent to this session so far."""
+    cursor = connection.cursor()
+    cursor.execute("SHOW SESSION STATUS LIKE 'Bytes_sent'")
+    value = int(cursor.fetchone()[1])
+    cursor.close()
+    return value
+
+
+def _measure_transfer(label, query, params, keep):
+    """Run query on a fresh session and report bytes, rows and wall time."""
+    connection = seed.connect_to_prodev()
+    before = _bytes_sent(connection)
+    start = time.perf_counter()
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute(query, params)
+    kept = 0
+    while True:
+        batch = cursor.fetchmany(1000)
+        if not batch:
+            break
+        kept += sum(1 for row in batch if keep(row))
+    cursor.close()
+    elapsed = time.perf_counter() - start
+    transferred = _bytes_sent(connection) - before
+    connection.close()
+    print(f"{label:<28} {kept:>9} rows {transferred / 1048576:>10.2f} MiB "
+          f"{elapsed:>8.3f}s")
+
+
+def bench_pushdown(args):
+    """Compare filtering in Python with pushing the filter into SQL."""
+    def python_filter(row):
+        return row['age'] > args.min_age
+
+    query, params = build_select()
+    _measure_transfer("SELECT * + Python filter", query, params,
+                      python_filter)
+    query, params = build_select(where=('age', '>', args.min_age))
+    _measure_transfer("WHERE pushed down", query, params, lambda row: True)
+    query, params = build_select(columns=('user_id', 'age'),
+                                 where=('age', '>', args.min_age))
+    _measure_transfer("WHERE + projection", query, params, lambda row: True)
+
+
+def _synthetic_batches(rows, batch_size):
+    """Yield user_data-shaped batches without touching the database."""
+    batch = []
+    for i in range(rows):
+        batch.append({
+            'user_id': f"{i:08x}-0000-4000-8000-000000000000",
+            'name': f"User {i}",
+            'email': f"user{i}@example.com",
+            'age': Decimal(i % 100),
+        })
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bench_sinks(args):
+    """Rows/sec writing synthetic batches to /dev/null through each sink."""
+    batches = list(_synthetic_batches(args.rows, args.batch_size))
+
+    def run(label, write):
+        start = time.perf_counter()
+        write()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<20} {args.rows / elapsed:>14,.0f} rows/sec "
+              f"{elapsed:>8.3f}s")
+
+    with open(os.devnull, 'w') as devnull:
+        def print_per_row():
+            with contextlib.redirect_stdout(devnull):
+                for batch in batches:
+                    for user in batch:
+                        print(user)
+
+        def through(sink):
+            def write():
+                for batch in batches:
+                    sink.write_batch(batch)
+                    sink.flush()
+                sink.close()
+            return write
+
+        run("print() per row", print_per_row)
+        run("StdoutSink", through(sinks.StdoutSink(devnull)))
+    run("JsonLinesSink", through(sinks.JsonLinesSink(os.devnull)))
+    run("CsvSink", through(sinks.CsvSink(os.devnull)))
+
+
+def bench_aggregate(args):
+    """Compare the per-row average loop with both aggregation paths."""
+    def per_row_loop():
+        total_age = 0
+        count = 0
+        for age in stream_ages.stream_user_ages():
+            total_age += age
+            count += 1
+        return total_age / count if count else 0
+
+    percentiles = tuple(args.percentiles)
+    runs = [
+        ("per-row loop", per_row_loop),
+        ("server-side", lambda: stream_ages.aggregate_ages(
+            percentiles, server_side=True)),
+        ("streaming chunks", lambda: stream_ages.aggregate_ages(
+            percentiles, server_side=False, chunk_size=args.chunk_size)),
+    ]
+    results = []
+    for label, run in runs:
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        results.append(result)
+        print(f"{label:<20} {elapsed:>8.3f}s  {result}")
+    if results[1] != results[2]:
+        raise SystemExit("server-side and streaming results differ")
+
+
+def bench_row_memory(args):
+    """Bytes per row held in memory for each row format."""
+    tuples = [(user['user_id'], user['name'], user['email'], user['age'])
+              for batch in _synthetic_batches(args.rows, args.rows)
+              for user in batch]
+
+    builders = [
+        ("dict", lambda: [dict(zip(rows.USER_COLUMNS, row))
+                          for row in tuples]),
+        ("UserRow", lambda: rows.convert_batch(tuples, 'row')),
+        ("UserBatch (columnar)",
+         lambda: rows.convert_batch(tuples, 'columnar')),
+    ]
+    for label, build in builders:
+        tracemalloc.start()
+        held = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del held
+        print(f"{label:<22} {size / args.rows:>8.1f} bytes/row "
+              "(excluding shared field values)")
+
+
+def bench_columnar(args):
+    """Build batches from fetchmany-style tuples and filter age > 25."""
+    tuples = [(user['user_id'], user['name'], user['email'], user['age'])
+              for batch in _synthetic_batches(args.rows, args.rows)
+              for user in batch]
+    chunks = [tuples[i:i + args.batch_size]
+              for i in range(0, len(tuples), args.batch_size)]
+
+    def dict_path():
+        kept = 0
+        for chunk in chunks:
+            batch = [dict(zip(rows.USER_COLUMNS, row)) for row in chunk]
+            kept += len([user for user in batch if user['age'] > 25])
+        return kept
+
+    def arrays_path():
+        kept = 0
+        for chunk in chunks:
+            batch = rows.ColumnarBatch.from_rows(chunk)
+            kept += len(batch.where('age', '>', 25))
+        return kept
+
+    backend = 'numpy' if rows.np is not None else 'array'
+    for label, run in (("list of dicts", dict_path),
+                       (f"ColumnarBatch ({backend})", arrays_path)):
+        start = time.perf_counter()
+        kept = run()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<24} {kept:>9} kept {elapsed:>8.3f}s "
+              f"{args.rows / elapsed:>14,.0f} rows/sec")
+
+
+def bench_pipeline(args):
+    """Per-stage lists and generators versus a fused Pipeline."""
+    users = [user for batch in _synthetic_batches(args.rows, args.rows)
+             for user in batch]
+
+    def adult(user):
+        return user['age'] > 25
+
+    def project(user):
+        return (user['name'], user['age'])
+
+    def named(user):
+        return bool(user[0])
+
+    def staged():
+        adults = [user for user in users if adult(user)]
+        projected = [project(user) for user in adults]
+        return len([user for user in projected if named(user)])
+
+    def nested():
+        adults = (user for user in users if adult(user))
+        projected = (project(user) for user in adults)
+        return sum(1 for user in projected if named(user))
+
+    def fused():
+        pipeline = Pipeline.from_iterable(users, args.batch_size) \
+            .filter(adult).map(project).filter(named)
+        return sum(1 for user in pipeline)
+
+    for label, run in (("list per stage", staged),
+                       ("nested generators", nested),
+                       ("fused Pipeline", fused)):
+        # Best of --repeat runs, to keep scheduler noise out of the ranking
+        elapsed = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            kept = run()
+            elapsed = min(elapsed, time.perf_counter() - start)
+        print(f"{label:<24} {kept:>9} kept {elapsed:>8.3f}s "
+              f"{args.rows / elapsed:>14,.0f} rows/sec")
+
+
+def main():
+    """Parse arguments and run the selected benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    pagination = subparsers.add_parser(
+        'pagination', help='pages/sec for lazy_pagination')
+    pagination.add_argument('--page-size', type=int, default=100)
+    pagination.add_argument('--pages', type=int, default=500)
+    pagination.set_defaults(func=bench_pagination)
+
+    stream_memory = subparsers.add_parser(
+        'stream-memory', help='peak RSS while streaming with stream_users')
+    stream_memory.add_argument('--fetch-size', type=int, default=1000)
+    stream_memory.add_argument('--rows', type=int, default=0,
+                               help='stop after this many rows (0 = all)')
+    stream_memory.add_argument('--every', type=int, default=1000000,
+                               help='report every N rows')
+    stream_memory.set_defaults(func=bench_stream_memory)
+
+    pushdown = subparsers.add_parser(
+        'pushdown', help='bytes and time with and without filter pushdown')
+    pushdown.add_argument('--min-age', type=int, default=25)
+    pushdown.set_defaults(func=bench_pushdown)
+
+    sink_parser = subparsers.add_parser(
+        'sinks', help='rows/sec for print() versus buffered sinks')
+    sink_parser.add_argument('--rows', type=int, default=1000000)
+    sink_parser.add_argument('--batch-size', type=int, default=1000)
+    sink_parser.set_defaults(func=bench_sinks)
+
+    aggregate = subparsers.add_parser(
+        'aggregate', help='average age: per-row loop versus aggregate_ages')
+    aggregate.add_argument('--chunk-size', type=int, default=10000)
+    aggregate.add_argument('--percentiles', type=float, nargs='*',
+                           default=[50, 90, 99])
+    aggregate.set_defaults(func=bench_aggregate)
+
+    row_memory = subparsers.add_parser(
+        'row-memory', help='memory per row for each row format')
+    row_memory.add_argument('--rows', type=int, default=100000)
+    row_memory.set_defaults(func=bench_row_memory)
+
+    columnar = subparsers.add_parser(
+        'columnar', help='dict batches versus ColumnarBatch with a filter')
+    columnar.add_argument('--rows', type=int, default=1000000)
+    columnar.add_argument('--batch-size', type=int, default=10000)
+    columnar.set_defaults(func=bench_columnar)
+
+    pipeline = subparsers.add_parser(
+        'pipeline',
+        help='per-stage lists and generators versus a fused Pipeline')
+    pipeline.add_argument('--rows', type=int, default=1000000)
+    pipeline.add_argument('--batch-size', type=int, default=1000)
+    pipeline.add_argument('--repeat', type=int, default=5,
+                          help='runs per variant; the fastest is reported')
+    pipeline.set_defaults(func=bench_pipeline)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
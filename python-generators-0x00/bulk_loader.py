@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Streaming bulk loader for the user_data table
+"""
+
+import csv
+import hashlib
+import os
+import time
+import uuid
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 10000
+# Keys per IN (...) lookup: SQLite before 3.32 allows 999 bound parameters
+LOOKUP_BATCH_SIZE = 500
+MAX_AGE = 999  # age is DECIMAL(3,0)
+
+INSERT_QUERY = """
+INSERT INTO user_data (user_id, name, email, age)
+VALUES (%s, %s, %s, %s)
+"""
+
+UPSERT_QUERY = """
+INSERT INTO user_data (user_id, name, email, age)
+VALUES (%s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    name = VALUES(name), email = VALUES(email), age = VALUES(age)
+"""
+
+EXISTING_HASHES_QUERY = """
+SELECT user_id, MD5(CONCAT_WS(CHAR(31), name, email, age)) FROM user_data
+WHERE user_id IN ({placeholders})
+"""
+
+# Per-connection staging table of the user_ids a sync has seen in the CSV
+SYNC_KEYS_TABLE_QUERY = """
+CREATE TEMPORARY TABLE user_data_sync_keys (user_id CHAR(36) PRIMARY KEY)
+"""
+
+SYNCED_KEYS_QUERY = """
+SELECT user_id FROM user_data_sync_keys WHERE user_id IN ({placeholders})
+"""
+
+# Progress of interrupted loads, one row per CSV file. Each chunk's
+# checkpoint is written in the same transaction as its rows.
+PROGRESS_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS user_data_load_progress (
+    csv_file VARCHAR(255) PRIMARY KEY,
+    signature VARCHAR(64) NOT NULL,
+    rows_loaded INT NOT NULL
+)
+"""
+
+# Namespace for deterministic user_ids derived from email addresses
+USER_ID_NAMESPACE = uuid.UUID('6f1c3a52-8d0e-4c5b-9a57-2f4e1b7d9c31')
+
+LOAD_DATA_QUERY = """
+LOAD DATA LOCAL INFILE '{path}'
+INTO TABLE user_data
+CHARACTER SET utf8mb4
+FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+LINES TERMINATED BY '\\n'
+IGNORE 1 LINES
+(name, email, @age)
+SET user_id = UUID(), age = @age
+"""
+
+
+class LoadReport:
+    """
+    Progress of a bulk load.
+
+    Attributes:
+        rows (int): Rows committed by this run
+        invalid (int): Rows rejected by validation, see parse_record
+        skipped (int): Rows skipped because an earlier run committed them
+        chunks (int): Chunks committed by this run
+        elapsed (float): Seconds spent loading
+    """
+
+    def __init__(self, skipped=0):
+        self.rows = 0
+        self.invalid = 0
+        self.skipped = skipped
+        self.chunks = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_sec(self):
+        """float: Load throughput of this run"""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"{self.rows} rows ({self.invalid} invalid) in "
+                f"{self.chunks} chunks, {self.elapsed:.2f}s "
+                f"({self.rows_per_sec:,.0f} rows/sec)")
+
+
+class SyncReport:
+    """
+    Outcome of an incremental sync.
+
+    Attributes:
+        upserted (int): New or changed rows written
+        unchanged (int): Rows skipped because their content hash matched
+        deleted (int): Rows removed because they are gone from the CSV
+        invalid (int): Rows rejected by validation, see parse_record
+        duplicates (int): Rows skipped because an earlier row of the CSV
+            has the same email, ignoring case
+        elapsed (float): Seconds spent syncing
+    """
+
+    def __init__(self):
+        self.upserted = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.invalid = 0
+        self.duplicates = 0
+        self.elapsed = 0.0
+
+    def __str__(self):
+        return (f"{self.upserted} upserted, {self.unchanged} unchanged, "
+                f"{self.deleted} deleted, {self.invalid} invalid, "
+                f"{self.duplicates} duplicates in {self.elapsed:.2f}s")
+
+
+def user_key(email):
+    """Deterministic user_id for a user: UUIDv5 of the normalised email"""
+    return str(uuid.uuid5(USER_ID_NAMESPACE, email.strip().lower()))
+
+
+def content_hash(name, email, age):
+    """
+    MD5 hex digest of a row's content.
+
+    Matches MD5(CONCAT_WS(CHAR(31), name, email, age)) computed by MySQL,
+    so unchanged rows can be detected without fetching their columns.
+    """
+    text = '\x1f'.join((name, email, str(age)))
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
+def _checkpoint_key(csv_file):
+    """Key of csv_file in user_data_load_progress"""
+    return os.path.abspath(csv_file)[-255:]
+
+
+def _file_signature(csv_file):
+    """Identify a CSV version so stale checkpoints are ignored"""
+    stat = os.stat(csv_file)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def read_checkpoint(connection, csv_file):
+    """
+    Return how many rows of csv_file an interrupted load already committed.
+
+    Creates user_data_load_progress on first use. Returns 0 when there is
+    no checkpoint or the file has changed since.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(PROGRESS_TABLE_QUERY)
+        cursor.execute(
+            "SELECT signature, rows_loaded FROM user_data_load_progress "
+            "WHERE csv_file = %s", (_checkpoint_key(csv_file),))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    connection.commit()
+    if row is None or row[0] != _file_signature(csv_file):
+        return 0
+    return row[1]
+
+
+def write_checkpoint(cursor, csv_file, rows):
+    """
+    Record that the first rows of csv_file are loaded.
+
+    Does not commit: run it on the cursor that inserted the rows, before
+    the commit, so the rows and the checkpoint are committed together
+    and a resumed load never inserts a committed row twice.
+    """
+    key = _checkpoint_key(csv_file)
+    cursor.execute("DELETE FROM user_data_load_progress WHERE csv_file = %s",
+                   (key,))
+    cursor.execute(
+        "INSERT INTO user_data_load_progress "
+        "(csv_file, signature, rows_loaded) VALUES (%s, %s, %s)",
+        (key, _file_signature(csv_file), rows))
+
+
+def clear_checkpoint(connection, csv_file):
+    """Remove the checkpoint for csv_file, if any"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "DELETE FROM user_data_load_progress WHERE csv_file = %s",
+            (_checkpoint_key(csv_file),))
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def random_key(email):
+    """Random user_id, as used by plain (non-incremental) loads"""
+    return str(uuid.uuid4())
+
+
+def parse_record(record, indices, key=random_key):
+    """
+    Validate one CSV record and convert it to a row tuple.
+
+    Every loader applies these rules, so they all load the same rows: a
+    record needs all three columns, a non-empty name, an email with an
+    '@' and an integer age that fits DECIMAL(3,0).
+
+    Args:
+        record (list): Fields of one CSV record
+        indices (tuple): Positions of the name, email and age columns
+        key (callable): Builds the user_id from the email address
+
+    Returns:
+        tuple: (user_id, name, email, age), or None if the record is invalid
+    """
+    name_index, email_index, age_index = indices
+    if len(record) <= max(indices):
+        return None
+    name = record[name_index]
+    email = record[email_index]
+    try:
+        age = int(record[age_index])
+    except ValueError:
+        return None
+    if not name or '@' not in email or not 0 <= age <= MAX_AGE:
+        return None
+    return (key(email), name, email, age)
+
+
+def iter_csv_rows(csv_file, skip=0, key=random_key, report=None):
+    """
+    Generator that yields (user_id, name, email, age) tuples from the CSV.
+
+    Records failing parse_record are skipped and counted in
+    report.invalid.
+
+    Args:
+        csv_file (str): Path to the CSV export
+        skip (int): Number of data rows to skip from the start
+        key (callable): Builds the user_id from the email address
+        report: Optional LoadReport or SyncReport counting invalid rows
+    """
+    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        indices = (header.index('name'), header.index('email'),
+                   header.index('age'))
+        for record in islice(reader, skip, None):
+            row = parse_record(record, indices, key)
+            if row is not None:
+                yield row
+            elif report is not None:
+                report.invalid += 1
+
+
+def iter_chunks(rows, chunk_size):
+    """Generator that groups an iterable into lists of chunk_size items"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_csv(connection, csv_file, chunk_size=DEFAULT_CHUNK_SIZE,
+             resume=True, progress=None):
+    """
+    Stream a CSV export into user_data in chunks, committing each chunk.
+
+    Only one chunk is held in memory at a time. Each chunk is committed
+    together with the number of rows loaded so far (see
+    write_checkpoint), so a failed load can be re-run and picks up
+    exactly after the last committed chunk. Records failing parse_record
+    are skipped and counted in the report, as in
+    csv_pipeline.pipelined_load.
+
+    Args:
+        connection: Open connection to ALX_prodev
+        csv_file (str): Path to the CSV export
+        chunk_size (int): Rows per executemany and per commit
+        resume (bool): Skip rows recorded by a previous partial load
+        progress (callable): Called with the LoadReport after each commit
+
+    Returns:
+        LoadReport: Rows loaded and throughput
+
+    Raises:
+        mysql.connector.Error: If a chunk fails; the chunk is rolled back
+            and the checkpoint still points at the last committed chunk
+    """
+    done = read_checkpoint(connection, csv_file) if resume else 0
+    report = LoadReport(skipped=done)
+    start = time.perf_counter()
+
+    cursor = connection.cursor()
+    try:
+        rows = iter_csv_rows(csv_file, skip=done, report=report)
+        for chunk in iter_chunks(rows, chunk_size):
+            # Invalid rows read so far are consumed too
+            consumed = report.skipped + report.rows + len(chunk) \
+                + report.invalid
+            try:
+                cursor.executemany(INSERT_QUERY, chunk)
+                write_checkpoint(cursor, csv_file, consumed)
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            report.rows += len(chunk)
+            report.chunks += 1
+            report.elapsed = time.perf_counter() - start
+            if progress is not None:
+                progress(report)
+    finally:
+        cursor.close()
+
+    report.elapsed = time.perf_counter() - start
+    clear_checkpoint(connection, csv_file)
+    return report
+
+
+def load_data_infile(connection, csv_file):
+    """
+    Load a CSV export with LOAD DATA LOCAL INFILE.
+
+    This is the fastest path: the server parses the file and generates
+    user_ids itself. It runs as a single statement, so it is not
+    resumable. The connection must be opened with allow_local_infile=True
+    and the server must have local_infile enabled.
+
+    Args:
+        connection: Open connection to ALX_prodev
+        csv_file (str): Path to the CSV export
+
+    Returns:
+        LoadReport: Rows loaded and throughput
+    """
+    path = os.path.abspath(csv_file).replace('\\', '\\\\').replace("'", "\\'")
+    report = LoadReport()
+    start = time.perf_counter()
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(LOAD_DATA_QUERY.format(path=path))
+        report.rows = cursor.rowcount
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    report.chunks = 1
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def _lookup(cursor, query, user_ids):
+    """
+    Run a query with an IN ({placeholders}) list over user_ids, at most
+    LOOKUP_BATCH_SIZE keys at a time, and return all the rows.
+    """
+    rows = []
+    for batch in iter_chunks(user_ids, LOOKUP_BATCH_SIZE):
+        placeholders = ', '.join(['%s'] * len(batch))
+        cursor.execute(query.format(placeholders=placeholders), batch)
+        rows.extend(cursor.fetchall())
+    return rows
+
+
+def _existing_hashes(cursor, user_ids):
+    """Map those of user_ids present in user_data to their content hash"""
+    return dict(_lookup(cursor, EXISTING_HASHES_QUERY, user_ids))
+
+
+def _first_rows(cursor, chunk, report):
+    """
+    Drop the rows of chunk whose user_id an earlier row already has.
+
+    Emails that differ only in case map to the same user_id, so without
+    this the last of them would overwrite the others on every run. The
+    first row wins, and later ones are counted in report.duplicates.
+    """
+    seen = {row[0] for row in _lookup(cursor, SYNCED_KEYS_QUERY,
+                                      [row[0] for row in chunk])}
+    rows = []
+    for row in chunk:
+        if row[0] in seen:
+            report.duplicates += 1
+        else:
+            seen.add(row[0])
+            rows.append(row)
+    return rows
+
+
+def sync_csv(connection, csv_file, chunk_size=DEFAULT_CHUNK_SIZE,
+             delete_missing=True, upsert_query=UPSERT_QUERY):
+    """
+    Bring user_data in line with a refreshed CSV, touching only deltas.
+
+    Rows are keyed by user_key(email), so the same user maps to the same
+    user_id on every run. The user_ids seen are staged in a temporary
+    table; a row whose email matches an earlier one, ignoring case, is
+    skipped and counted as a duplicate, so the first of them is kept.
+    The CSV is read chunk_size rows at a time and the content hashes of
+    just those rows are looked up; rows whose hash matches are skipped
+    and new or changed rows are written with batched INSERT ... ON
+    DUPLICATE KEY UPDATE. With delete_missing, rows of user_data missing
+    from the staging table are deleted at the end. Memory therefore
+    stays at one chunk however large the table is. Running it twice on
+    the same file changes nothing the second time.
+
+    Rows loaded by load_csv carry random user_ids, so the first sync over
+    such a table replaces them with deterministic ones. Records failing
+    parse_record are skipped and counted as invalid, like in load_csv; with
+    delete_missing their users are therefore deleted like missing ones.
+
+    Args:
+        connection: Open connection to ALX_prodev
+        csv_file (str): Path to the CSV export
+        chunk_size (int): Rows per upsert batch and commit; lookups go
+            LOOKUP_BATCH_SIZE keys at a time
+        delete_missing (bool): Delete rows that are absent from the CSV
+        upsert_query (str): Insert-or-update statement for the backend,
+            see backends.Backend.upsert_query
+
+    Returns:
+        SyncReport: Counts of upserted, unchanged, deleted, invalid and
+            duplicate rows
+    """
+    report = SyncReport()
+    start = time.perf_counter()
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute("DROP TABLE IF EXISTS user_data_sync_keys")
+        cursor.execute(SYNC_KEYS_TABLE_QUERY)
+        rows = iter_csv_rows(csv_file, key=user_key, report=report)
+        for chunk in iter_chunks(rows, chunk_size):
+            chunk = _first_rows(cursor, chunk, report)
+            if not chunk:
+                continue
+            existing = _existing_hashes(cursor, [row[0] for row in chunk])
+            changed = [row for row in chunk
+                       if existing.get(row[0]) != content_hash(*row[1:])]
+            report.unchanged += len(chunk) - len(changed)
+            try:
+                cursor.executemany(
+                    "INSERT INTO user_data_sync_keys (user_id) "
+                    "VALUES (%s)", [(row[0],) for row in chunk])
+                if changed:
+                    cursor.executemany(upsert_query, changed)
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            report.upserted += len(changed)
+
+        if delete_missing:
+            try:
+                cursor.execute(
+                    "DELETE FROM user_data WHERE user_id NOT IN "
+                    "(SELECT user_id FROM user_data_sync_keys)")
+                report.deleted = cursor.rowcount
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+    finally:
+        cursor.execute("DROP TABLE IF EXISTS user_data_sync_keys")
+        cursor.close()
+
+    report.elapsed = time.perf_counter() - start
+    return report
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Checks that stream_users streams in constant memory.
+
+By default a SQLite stand-in for user_data is generated with --rows rows
+in a scratch directory, then stream_users walks it under tracemalloc.
+Once --warmup rows have been read the Python heap in use is taken as the
+baseline; the script exits with status 1 if the heap ever grows more than
+--tolerance MiB above it during the rest of the scan:
+
+    python3 check_stream_memory.py --rows 10000000 --tolerance 8
+
+tracemalloc counts the Python objects the stream holds on to, and not
+SQLite's page cache or mmap window. Those are bounded by the backend's
+pragmas but fill gradually, so they would show up in RSS as growth. Peak
+RSS is printed for reference only.
+
+With --existing nothing is generated and the database configured in .env
+(MySQL by default) is streamed as it is, so a seeded ALX_prodev table can
+be checked the same way.
+"""
+
+import argparse
+import os
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import connection_pool
+
+stream_users = __import__('0-stream_users')
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MiB (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def generate_users(db_path, rows):
+    """
+    Create a SQLite user_data table holding rows generated users.
+
+    The rows are produced by a recursive CTE inside SQLite, so generating
+    them does not grow this process's Python heap.
+    """
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.execute("PRAGMA journal_mode=OFF")
+        connection.execute("PRAGMA synchronous=OFF")
+        connection.execute(
+            "CREATE TABLE user_data (user_id CHAR(36) PRIMARY KEY, "
+            "name VARCHAR(255) NOT NULL, email VARCHAR(255) NOT NULL, "
+            "age DECIMAL(3,0) NOT NULL) WITHOUT ROWID")
+        connection.execute("""
+            WITH RECURSIVE seq(i) AS (
+                SELECT 0 UNION ALL SELECT i + 1 FROM seq WHERE i + 1 < ?
+            )
+            INSERT INTO user_data
+            SELECT printf('%036d', i), 'user ' || i,
+                   'user' || i || '@example.com', 18 + i % 80
+            FROM seq
+        """, (rows,))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def check(fetch_size, warmup, tolerance, limit=0):
+    """
+    Stream the table and compare the Python heap after warmup rows with
+    its peak over the rest of the scan.
+
+    Returns:
+        bool: True if the heap grew by no more than tolerance MiB
+    """
+    mib = 1024 * 1024
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        baseline = None
+        count = 0
+        for _ in stream_users.stream_users(fetch_size=fetch_size):
+            count += 1
+            if count == warmup:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            if limit and count >= limit:
+                break
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    if baseline is None:
+        print(f"only {count} rows streamed, fewer than --warmup {warmup}")
+        return False
+    growth = (peak - baseline) / mib
+    print(f"streamed {count} rows in {elapsed:.1f}s; Python heap "
+          f"{baseline / mib:.1f} MiB after warm-up, peak "
+          f"{peak / mib:.1f} MiB (+{growth:.1f}, tolerance "
+          f"{tolerance:.1f}); peak RSS {_peak_rss_mb():.1f} MiB")
+    return growth <= tolerance
+
+
+def main():
+    """Parse arguments, prepare the table and run the check"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000000,
+                        help='rows to generate (and stream)')
+    parser.add_argument('--fetch-size', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=10000,
+                        help='rows read before the baseline is taken')
+    parser.add_argument('--tolerance', type=float, default=8.0,
+                        help='allowed Python heap growth in MiB')
+    parser.add_argument('--existing', action='store_true',
+                        help='stream the configured database instead of '
+                             'a generated SQLite stand-in')
+    parser.add_argument('--dir', default=None,
+                        help='directory for the generated database')
+    args = parser.parse_args()
+
+    if args.existing:
+        ok = check(args.fetch_size, args.warmup, args.tolerance, args.rows)
+    else:
+        with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+            db_path = os.path.join(directory, 'user_data.db')
+            start = time.perf_counter()
+            generate_users(db_path, args.rows)
+            print(f"generated {args.rows} rows in "
+                  f"{time.perf_counter() - start:.1f}s")
+            os.environ['DB_BACKEND'] = 'sqlite'
+            os.environ['DB_PATH'] = db_path
+            try:
+                ok = check(args.fetch_size, args.warmup, args.tolerance)
+            finally:
+                connection_pool.get_pool().close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
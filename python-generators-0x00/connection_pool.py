@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Connection pool for the ALX_prodev database shared by the generator scripts
+"""
+
+import os
+import threading
+import time
+
+import seed
+from backends import Error
+
+
+class PoolExhaustedError(Error):
+    """Raised when no connection becomes available within the pool timeout"""
+
+
+class PoolStats:
+    """
+    Counters describing how the pool has been used.
+
+    Attributes:
+        checkouts (int): Connections handed out
+        hits (int): Checkouts served by an idle pooled connection
+        misses (int): Checkouts that had to open a new connection
+        evictions (int): Idle connections closed for exceeding idle_timeout
+        failed_health_checks (int): Pooled connections found dead on checkout
+        discarded (int): Connections dropped on return instead of reused
+        wait_time (float): Total seconds spent waiting for a free slot
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.failed_health_checks = 0
+        self.discarded = 0
+        self.wait_time = 0.0
+
+    @property
+    def hit_rate(self):
+        """float: Fraction of checkouts served from the pool"""
+        return self.hits / self.checkouts if self.checkouts else 0.0
+
+    @property
+    def average_wait(self):
+        """float: Mean seconds a checkout waited for a free slot"""
+        return self.wait_time / self.checkouts if self.checkouts else 0.0
+
+    def as_dict(self):
+        """Return the counters as a plain dictionary"""
+        return {
+            'checkouts': self.checkouts,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'evictions': self.evictions,
+            'failed_health_checks': self.failed_health_checks,
+            'discarded': self.discarded,
+            'wait_time': self.wait_time,
+            'average_wait': self.average_wait,
+        }
+
+
+class PooledConnection:
+    """
+    Proxy around a pooled MySQL connection.
+
+    Behaves like the underlying connection, except that close() hands
+    the connection back to the pool instead of disconnecting it.
+    """
+
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name):
+        if self.__dict__.get('_connection') is None:
+            raise Error("Connection has already been returned to the pool")
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Return the connection to the pool"""
+        connection = self.__dict__.get('_connection')
+        self._connection = None
+        if connection is not None:
+            self._pool.release(connection)
+
+
+class ConnectionPool:
+    """
+    A bounded pool of connections to the ALX_prodev database.
+
+    Args:
+        size (int): Maximum number of open connections
+        timeout (float): Seconds to wait for a free connection
+        idle_timeout (float): Seconds an idle connection may stay pooled
+        connect (callable): Factory opening a new raw connection
+    """
+
+    def __init__(self, size=5, timeout=30.0, idle_timeout=300.0,
+                 connect=seed.connect_to_prodev):
+        self.size = size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.stats = PoolStats()
+        self._connect = connect
+        self._idle = []
+        self._open = 0
+        self._lock = threading.Condition()
+
+    def _evict_idle(self, now):
+        """Close idle connections older than idle_timeout (lock held)"""
+        fresh = []
+        for connection, returned_at in self._idle:
+            if now - returned_at > self.idle_timeout:
+                self._disconnect(connection)
+                self.stats.evictions += 1
+            else:
+                fresh.append((connection, returned_at))
+        self._idle = fresh
+
+    def _disconnect(self, connection):
+        """Close a raw connection and free its slot (lock held)"""
+        self._open -= 1
+        try:
+            connection.close()
+        except Error:
+            pass
+
+    def _checkout_idle(self):
+        """Pop a healthy idle connection, or None (lock held)"""
+        while self._idle:
+            connection, _ = self._idle.pop()
+            try:
+                healthy = connection.is_connected()
+            except Error:
+                healthy = False
+            if healthy:
+                return connection
+            self.stats.failed_health_checks += 1
+            self._disconnect(connection)
+        return None
+
+    def connect(self):
+        """
+        Check a connection out of the pool.
+
+        Returns:
+            PooledConnection: A connection that returns to the pool on close()
+
+        Raises:
+            PoolExhaustedError: If no connection frees up within timeout
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._evict_idle(now)
+                connection = self._checkout_idle()
+                if connection is not None:
+                    self.stats.hits += 1
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    self.stats.misses += 1
+                    connection = None
+                    break
+                if now >= deadline or not self._lock.wait(deadline - now):
+                    self.stats.wait_time += time.monotonic() - start
+                    raise PoolExhaustedError(
+                        f"No connection available after {self.timeout}s")
+            self.stats.checkouts += 1
+            self.stats.wait_time += time.monotonic() - start
+
+        if connection is None:
+            connection = self._connect()
+            if connection is None:
+                # seed.connect_to_prodev() already reported the error
+                with self._lock:
+                    self._open -= 1
+                    self._lock.notify()
+                return None
+        return PooledConnection(self, connection)
+
+    def release(self, connection):
+        """
+        Take a connection back into the pool.
+
+        Any open transaction is rolled back so the next user starts from a
+        fresh snapshot. Connections that cannot be reset are discarded.
+        """
+        reusable = not connection.unread_result
+        if reusable:
+            try:
+                connection.rollback()
+            except Error:
+                reusable = False
+
+        with self._lock:
+            if reusable:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self.stats.discarded += 1
+                self._disconnect(connection)
+            self._lock.notify()
+
+    def close(self):
+        """Close every idle connection held by the pool"""
+        with self._lock:
+            for connection, _ in self._idle:
+                self._disconnect(connection)
+            self._idle = []
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Return the process-wide pool, creating it on first use.
+
+    Sizing is read from the environment loaded by seed.py:
+    DB_POOL_SIZE, DB_POOL_TIMEOUT and DB_POOL_IDLE_TIMEOUT.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                size=int(os.getenv('DB_POOL_SIZE', '5')),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+                idle_timeout=float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300')),
+            )
+        return _pool
+
+
+def connect_to_prodev():
+    """Checks a connection to the ALX_prodev database out of the pool"""
+    return get_pool().connect()
+
+
+def pool_stats():
+    """Return the shared pool's counters as a dictionary"""
+    return get_pool().stats.as_dict()
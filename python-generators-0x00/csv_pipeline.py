@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Pipelined CSV loader: a reader thread, a process pool parsing blocks of
+lines into typed tuples, and a batched writer, joined by bounded queues
+"""
+
+import csv
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import bulk_loader
+
+DEFAULT_BLOCK_LINES = 10000
+DEFAULT_QUEUE_DEPTH = 4
+
+_DONE = object()
+
+
+class _Failure:
+    """Carries an exception from a pipeline stage to the writer"""
+
+    def __init__(self, error):
+        self.error = error
+
+
+class StageStats:
+    """
+    Throughput of one pipeline stage.
+
+    Attributes:
+        name (str): Stage name
+        blocks (int): Blocks handled
+        rows (int): Rows handled
+        busy (float): Seconds spent doing work
+        waiting (float): Seconds spent blocked on the neighbouring queues
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.blocks = 0
+        self.rows = 0
+        self.busy = 0.0
+        self.waiting = 0.0
+
+    @property
+    def rows_per_sec(self):
+        """float: Rows per second of busy time"""
+        return self.rows / self.busy if self.busy else 0.0
+
+    def __str__(self):
+        return (f"{self.name:<7} {self.rows:>10} rows {self.busy:>8.2f}s busy "
+                f"{self.waiting:>8.2f}s waiting "
+                f"{self.rows_per_sec:>12,.0f} rows/sec")
+
+
+class PipelineReport:
+    """
+    Outcome of a pipelined load.
+
+    The stage with the lowest rows/sec (for parse, per worker-second) and
+    the least waiting time is the bottleneck.
+
+    Attributes:
+        read, parse, write (StageStats): Per-stage throughput
+        invalid (int): Rows rejected by validation
+        skipped (int): Rows skipped because an earlier run committed them
+        elapsed (float): Wall-clock seconds for the whole load
+    """
+
+    def __init__(self, skipped=0):
+        self.read = StageStats('read')
+        self.parse = StageStats('parse')
+        self.write = StageStats('write')
+        self.invalid = 0
+        self.skipped = skipped
+        self.elapsed = 0.0
+
+    @property
+    def rows(self):
+        """int: Rows written"""
+        return self.write.rows
+
+    def __str__(self):
+        rate = self.rows / self.elapsed if self.elapsed else 0.0
+        lines = [f"{self.rows} rows ({self.invalid} invalid) in "
+                 f"{self.elapsed:.2f}s ({rate:,.0f} rows/sec)"]
+        lines.extend(str(stage)
+                     for stage in (self.read, self.parse, self.write))
+        return '\n'.join(lines)
+
+
+def parse_block(lines, indices, deterministic_keys):
+    """
+    Parse and validate a block of CSV lines into row tuples with
+    bulk_loader.parse_record, so the same rows are rejected as by
+    bulk_loader.load_csv. Runs in a worker process.
+
+    Args:
+        lines (list): Raw CSV lines, each holding one complete record
+        indices (tuple): Positions of the name, email and age columns
+        deterministic_keys (bool): Key rows by bulk_loader.user_key
+            instead of a random UUID
+
+    Returns:
+        tuple: (rows, invalid, seconds) where rows are
+            (user_id, name, email, age) tuples
+    """
+    start = time.perf_counter()
+    key = bulk_loader.user_key if deterministic_keys \
+        else bulk_loader.random_key
+    rows = []
+    invalid = 0
+    for record in csv.reader(lines):
+        row = bulk_loader.parse_record(record, indices, key)
+        if row is None:
+            invalid += 1
+        else:
+            rows.append(row)
+    return rows, invalid, time.perf_counter() - start
+
+
+def _put(target, item, stop, stats):
+    """Put onto a bounded queue, giving up if the pipeline is stopping"""
+    start = time.perf_counter()
+    try:
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    finally:
+        stats.waiting += time.perf_counter() - start
+
+
+def _get(source, stop, stats):
+    """Take from a queue, counting the time spent blocked"""
+    start = time.perf_counter()
+    try:
+        while not stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+    finally:
+        stats.waiting += time.perf_counter() - start
+
+
+def _read_blocks(file, skip, block_lines, output, stop, stats):
+    """
+    Reader stage: split the file into blocks of complete records.
+
+    A line with an odd number of quote characters opens a quoted field
+    containing a newline, so it is joined with the following lines.
+    """
+    try:
+        block = []
+        pending = ''
+        started = time.perf_counter()
+        for line in file:
+            if pending:
+                line = pending + line
+            if line.count('"') % 2:
+                pending = line
+                continue
+            pending = ''
+            if skip:
+                skip -= 1
+                continue
+            block.append(line)
+            if len(block) >= block_lines:
+                stats.busy += time.perf_counter() - started
+                stats.blocks += 1
+                stats.rows += len(block)
+                if not _put(output, block, stop, stats):
+                    return
+                block = []
+                started = time.perf_counter()
+        if pending:
+            block.append(pending)
+        stats.busy += time.perf_counter() - started
+        if block:
+            stats.blocks += 1
+            stats.rows += len(block)
+            if not _put(output, block, stop, stats):
+                return
+        _put(output, _DONE, stop, stats)
+    except BaseException as error:
+        _put(output, _Failure(error), stop, stats)
+
+
+def _parse_blocks(executor, source, output, stop, max_in_flight, indices,
+                  deterministic_keys, stats):
+    """
+    Parse stage: fan blocks out to the process pool and pass the results
+    on in file order, with at most max_in_flight blocks outstanding.
+    """
+    in_flight = deque()
+
+    def forward_oldest():
+        rows, invalid, seconds = in_flight.popleft().result()
+        stats.blocks += 1
+        stats.rows += len(rows) + invalid
+        stats.busy += seconds
+        return _put(output, (rows, invalid), stop, stats)
+
+    try:
+        while True:
+            block = _get(source, stop, stats)
+            if block is _DONE or isinstance(block, _Failure):
+                while in_flight:
+                    if not forward_oldest():
+                        return
+                _put(output, block, stop, stats)
+                return
+            in_flight.append(executor.submit(
+                parse_block, block, indices, deterministic_keys))
+            while len(in_flight) >= max_in_flight:
+                if not forward_oldest():
+                    return
+    except BaseException as error:
+        _put(output, _Failure(error), stop, stats)
+
+
+def pipelined_load(connection, csv_file, workers=None,
+                   block_lines=DEFAULT_BLOCK_LINES,
+                   queue_depth=DEFAULT_QUEUE_DEPTH,
+                   deterministic_keys=False, resume=True):
+    """
+    Load a CSV export into user_data with reading, parsing and writing
+    overlapped.
+
+    A reader thread splits the file into blocks of raw lines, a process
+    pool parses and validates the blocks into (user_id, name, email, age)
+    tuples, and the calling thread inserts each block with executemany
+    and commits it. Stages are joined by queues of queue_depth blocks, so
+    memory stays bounded whichever stage is slowest. Blocks are written
+    in file order and checkpointed like bulk_loader.load_csv, so a failed
+    load resumes after the last committed block.
+
+    Args:
+        connection: Open connection to ALX_prodev
+        csv_file (str): Path to the CSV export
+        workers (int): Parser processes, defaults to os.cpu_count()
+        block_lines (int): Records per block, insert batch and commit
+        queue_depth (int): Blocks buffered between stages
+        deterministic_keys (bool): Key rows by bulk_loader.user_key
+        resume (bool): Skip rows recorded by a previous partial load
+
+    Returns:
+        PipelineReport: Per-stage throughput
+    """
+    workers = workers or os.cpu_count() or 1
+    done = bulk_loader.read_checkpoint(connection, csv_file) \
+        if resume else 0
+    report = PipelineReport(skipped=done)
+    start = time.perf_counter()
+
+    raw_blocks = queue.Queue(maxsize=queue_depth)
+    parsed_blocks = queue.Queue(maxsize=queue_depth)
+    stop = threading.Event()
+
+    with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+        header = next(csv.reader([file.readline()]))
+        indices = (header.index('name'), header.index('email'),
+                   header.index('age'))
+
+        # The parser thread starts workers while the reader thread runs,
+        # and forking a threaded process can deadlock the child, so the
+        # workers are spawned
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'))
+        reader = threading.Thread(
+            target=_read_blocks, name='csv-reader', daemon=True,
+            args=(file, done, block_lines, raw_blocks, stop, report.read))
+        parser = threading.Thread(
+            target=_parse_blocks, name='csv-parser', daemon=True,
+            args=(executor, raw_blocks, parsed_blocks, stop, workers * 2,
+                  indices, deterministic_keys, report.parse))
+        reader.start()
+        parser.start()
+
+        cursor = connection.cursor()
+        try:
+            while True:
+                item = _get(parsed_blocks, stop, report.write)
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                rows, invalid = item
+                started = time.perf_counter()
+                try:
+                    if rows:
+                        cursor.executemany(bulk_loader.INSERT_QUERY, rows)
+                    bulk_loader.write_checkpoint(cursor, csv_file,
+                                                 done + len(rows) + invalid)
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+                done += len(rows) + invalid
+                report.write.busy += time.perf_counter() - started
+                report.write.blocks += 1
+                report.write.rows += len(rows)
+                report.invalid += invalid
+        finally:
+            stop.set()
+            cursor.close()
+            reader.join()
+            parser.join()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    report.elapsed = time.perf_counter() - start
+    bulk_loader.clear_checkpoint(connection, csv_file)
+    return report
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Parallel scan of user_data split into user_id key ranges across a
+process pool
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import connection_pool
+from query_builder import build_select
+
+# Upper bound on the rows in one key range; a worker returns its whole
+# range at once, so this bounds the memory held per in-flight range
+SHARD_ROWS = 50000
+
+
+def split_key_ranges(shards, max_rows=None):
+    """
+    Split user_data into key ranges holding roughly equal numbers of rows.
+
+    Boundaries are read from the user_id primary key index. Each boundary
+    query skips OFFSET index entries past the previous boundary, so
+    splitting walks the index once (no table rows are read) rather than
+    rescanning it from the start for every boundary.
+
+    Args:
+        shards (int): Minimum number of ranges to produce
+        max_rows (int): Optional cap on the rows per range; more ranges
+            are produced when the table needs them
+
+    Returns:
+        list: (low, high) tuples; a range covers low < user_id <= high,
+            with None meaning unbounded on that side
+    """
+    connection = connection_pool.connect_to_prodev()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM user_data")
+        count = cursor.fetchone()[0]
+        if max_rows:
+            shards = max(shards, -(-count // max_rows))
+        boundaries = []
+        position = -1
+        for shard in range(1, shards):
+            target = shard * count // shards - 1
+            if target <= position:
+                continue
+            if boundaries:
+                cursor.execute(
+                    "SELECT user_id FROM user_data WHERE user_id > %s "
+                    "ORDER BY user_id LIMIT 1 OFFSET %s",
+                    (boundaries[-1], target - position - 1))
+            else:
+                cursor.execute(
+                    "SELECT user_id FROM user_data ORDER BY user_id "
+                    "LIMIT 1 OFFSET %s", (target,))
+            row = cursor.fetchone()
+            if not row:
+                break
+            boundaries.append(row[0])
+            position = target
+    finally:
+        cursor.close()
+        connection.close()
+
+    edges = [None] + boundaries + [None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _range_predicate(where, low, high):
+    """Combine a caller's predicate with the bounds of one key range"""
+    if not where:
+        predicates = []
+    elif isinstance(where, tuple):
+        predicates = [where]
+    else:
+        predicates = list(where)
+    if low is not None:
+        predicates.append(('user_id', '>', low))
+    if high is not None:
+        predicates.append(('user_id', '<=', high))
+    return predicates
+
+
+def scan_range(low, high, batch_size, where=None, columns=None,
+               process=None):
+    """
+    Read one key range in batches. Runs inside a worker process, on a
+    connection from the worker's own pool (see parallel_scan).
+
+    Args:
+        low (str): Exclusive lower user_id bound, or None
+        high (str): Inclusive upper user_id bound, or None
+        batch_size (int): Rows per batch
+        where: Predicate, see query_builder.compile_where
+        columns (sequence): Columns to fetch, or None for every column
+        process (callable): Optional function applied to each batch in
+            the worker; must be picklable (a module-level function)
+
+    Returns:
+        list: Batches of user records as dictionaries
+    """
+    query, params = build_select(
+        columns=columns, where=_range_predicate(where, low, high),
+        order_by='user_id')
+
+    batches = []
+    connection = connection_pool.connect_to_prodev()
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(query, params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            if process is not None:
+                batch = process(batch)
+            if batch:
+                batches.append(batch)
+    finally:
+        cursor.close()
+        connection.close()
+    return batches
+
+
+def parallel_scan(batch_size, workers=None, shards=None, where=None,
+                  columns=None, process=None, ordered=True,
+                  shard_rows=SHARD_ROWS):
+    """
+    Generator that scans user_data in parallel and yields batches shaped
+    like those from stream_users_in_batches.
+
+    The table is split into key ranges on user_id and each range is read
+    by a ProcessPoolExecutor worker with its own connection, so per-row
+    Python work passed as process scales with cores. At most workers
+    ranges are in flight at a time, the next one submitted as each
+    completes, so memory stays around workers * shard_rows rows however
+    large the table is.
+
+    Args:
+        batch_size (int): Rows per batch
+        workers (int): Worker processes, defaults to os.cpu_count()
+        shards (int): Key ranges to split into, defaults to 4 per worker
+            so faster workers pick up more of the table
+        where: Predicate pushed down into each range query
+        columns (sequence): Columns to fetch, or None for every column
+        process (callable): Module-level function applied to each batch
+            in the workers, e.g. to filter or transform rows
+        ordered (bool): Yield batches in user_id order; when False,
+            ranges are yielded as soon as they complete
+        shard_rows (int): Most rows per key range; more ranges than
+            shards are used when the table is larger
+
+    Yields:
+        list: A batch of user records
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = iter(split_key_ranges(shards or workers * 4, shard_rows))
+
+    # Workers are spawned rather than forked: a forked worker would
+    # inherit the parent's pooled connections (the one split_key_ranges
+    # used among them), sharing their sockets and finalizing them when
+    # it drops them. Spawned workers start empty and open their own.
+    executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def submit():
+        """Submit the next range, returning False when none are left"""
+        for low, high in ranges:
+            pending.append(executor.submit(scan_range, low, high, batch_size,
+                                           where, columns, process))
+            return True
+        return False
+
+    pending = deque()
+    try:
+        while len(pending) < workers and submit():
+            pass
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+            batches = future.result()
+            submit()
+            yield from batches
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Lazy, composable pipelines over the user_data streams.
+
+Usage:
+    adults = (Pipeline.from_users(1000)
+              .filter(('age', '>', 25))
+              .select('name', 'age')
+              .map(format_user))
+    for line in adults:
+        print(line)
+
+Each method returns a new Pipeline; nothing runs until it is iterated or
+reduced. Declarative (column, operator, value) filters and select()
+projections given before any map() are pushed down into the SQL query.
+Adjacent filter() and map() stages are fused into one chain of the
+built-in map() and filter() instead of one generator per stage.
+"""
+
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from itertools import chain, islice
+
+from parallel_scan import parallel_scan
+from query_builder import OPERATORS, USER_COLUMNS
+from rows import COMPARISONS
+
+stream_users_in_batches = __import__(
+    '1-batch_processing').stream_users_in_batches
+
+_ROW_STAGES = ('filter', 'map')
+
+
+class _Predicate:
+    """A (column, operator, value) filter evaluated in Python"""
+
+    def __init__(self, column, operator, value):
+        operator = operator.upper()
+        if operator not in OPERATORS:
+            raise ValueError(f"Unsupported operator: {operator!r}")
+        self.column = column
+        if operator == 'IN':
+            values = frozenset(value)
+            self._test = values.__contains__
+        elif operator == 'LIKE':
+            pattern = ''.join(
+                '.*' if char == '%' else '.' if char == '_'
+                else re.escape(char) for char in value)
+            # MySQL's default collation compares case-insensitively
+            self._test = re.compile(pattern, re.IGNORECASE | re.DOTALL) \
+                .fullmatch
+        else:
+            compare = COMPARISONS[operator]
+            self._test = lambda item: compare(item, value)
+        self.predicate = (column, operator, value)
+
+    def __call__(self, row):
+        return bool(self._test(row[self.column]))
+
+    def __reduce__(self):
+        return (_Predicate, self.predicate)
+
+
+class _Project:
+    """A select() projection evaluated in Python"""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __call__(self, row):
+        return {column: row[column] for column in self.columns}
+
+
+class _Fused:
+    """
+    Adjacent filter and map stages applied to rows in one pass.
+
+    The stages are chained with the built-in map() and filter(), so a row
+    goes through every stage without a Python generator frame per stage.
+    Picklable as long as the stage functions are, so parallel() can ship
+    it to worker processes.
+    """
+
+    def __init__(self, stages):
+        self.stages = tuple(stages)
+
+    def iterate(self, rows):
+        """Return an iterator over rows with every stage applied"""
+        rows = iter(rows)
+        for kind, function in self.stages:
+            rows = map(function, rows) if kind == 'map' \
+                else filter(function, rows)
+        return rows
+
+    def __call__(self, batch):
+        return list(self.iterate(batch))
+
+
+def _batches(rows, size):
+    """Group rows into lists of size rows"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _windows(rows, size, step):
+    """
+    Yield sliding windows of size rows: the first once size rows have
+    arrived, then one every step rows
+    """
+    window = deque(maxlen=size)
+    remaining = size
+    for row in rows:
+        window.append(row)
+        remaining -= 1
+        if not remaining:
+            remaining = step
+            yield tuple(window)
+
+
+def _map_bounded(executor, function, items, limit):
+    """
+    Like executor.map, but keeps at most limit calls in flight and pulls
+    items lazily, so a large or endless source is not read up front
+    """
+    pending = deque()
+    items = iter(items)
+    for item in islice(items, limit):
+        pending.append(executor.submit(function, item))
+    while pending:
+        result = pending.popleft().result()
+        for item in islice(items, 1):
+            pending.append(executor.submit(function, item))
+        yield result
+
+
+class Pipeline:
+    """
+    A lazy chain of stages over a source of rows.
+
+    Build one with from_users() to read user_data, or from_iterable() for
+    any other rows, then chain filter(), select(), map(), batch(),
+    window() and parallel(). Iterate the pipeline or call reduce() to run
+    it.
+    """
+
+    def __init__(self, source=None, batch_size=1000, where=(), columns=None,
+                 stages=(), workers=None):
+        self._source = source
+        self._batch_size = batch_size
+        self._where = tuple(where)
+        self._columns = columns
+        self._stages = tuple(stages)
+        self._workers = workers
+
+    @classmethod
+    def from_users(cls, batch_size=1000):
+        """
+        Pipeline over the rows of user_data, fetched batch_size at a time.
+
+        Args:
+            batch_size (int): Rows per fetch from the database
+        """
+        return cls(batch_size=batch_size)
+
+    @classmethod
+    def from_iterable(cls, iterable, batch_size=1000):
+        """
+        Pipeline over any iterable of rows.
+
+        Args:
+            iterable: Rows to process
+            batch_size (int): Rows per chunk when running in parallel
+        """
+        return cls(source=iterable, batch_size=batch_size)
+
+    def _replace(self, **changes):
+        state = {
+            'source': self._source,
+            'batch_size': self._batch_size,
+            'where': self._where,
+            'columns': self._columns,
+            'stages': self._stages,
+            'workers': self._workers,
+        }
+        state.update(changes)
+        return Pipeline(**state)
+
+    def _pushdown_allowed(self):
+        """Whether rows still come straight from the SQL query"""
+        return self._source is None and not self._stages
+
+    def _add(self, kind, argument):
+        return self._replace(stages=self._stages + ((kind, argument),))
+
+    def filter(self, predicate):
+        """
+        Keep the rows for which predicate is true.
+
+        Args:
+            predicate: A function of a row, or a (column, operator, value)
+                tuple or list of tuples as accepted by compile_where. Tuples
+                given before any other stage are evaluated in SQL.
+        """
+        if callable(predicate):
+            return self._add('filter', predicate)
+        predicates = [predicate] if isinstance(predicate, tuple) \
+            else list(predicate)
+        if self._pushdown_allowed():
+            return self._replace(where=self._where + tuple(predicates))
+        pipeline = self
+        for column, operator, value in predicates:
+            pipeline = pipeline._add('filter',
+                                     _Predicate(column, operator, value))
+        return pipeline
+
+    def select(self, *columns):
+        """
+        Keep only the given columns of each row.
+
+        Before any map() the projection is evaluated in SQL, so the other
+        columns are never fetched.
+        """
+        for column in columns:
+            if column not in USER_COLUMNS:
+                raise ValueError(f"Unknown column: {column!r}")
+        if self._pushdown_allowed():
+            if self._columns is not None:
+                missing = set(columns) - set(self._columns)
+                if missing:
+                    raise ValueError(f"Columns not selected: {missing}")
+            return self._replace(columns=tuple(columns))
+        return self._add('map', _Project(tuple(columns)))
+
+    def map(self, function):
+        """Replace each row by function(row)"""
+        return self._add('map', function)
+
+    def batch(self, size):
+        """Group rows into lists of size rows (the last may be shorter)"""
+        return self._add('batch', size)
+
+    def window(self, size, step=1):
+        """
+        Yield sliding windows of size consecutive rows as tuples.
+
+        Args:
+            size (int): Rows per window
+            step (int): Rows the window advances by; step=size gives
+                non-overlapping windows
+        """
+        if size < 1 or step < 1:
+            raise ValueError("size and step must be positive")
+        return self._add('window', (size, step))
+
+    def parallel(self, workers):
+        """
+        Run the filter and map stages that directly follow the source in
+        workers processes.
+
+        For user_data the table is split with parallel_scan, so each
+        worker also does its own reads; other sources are chunked into
+        batch_size rows and read only as workers need them, with about
+        two chunks per worker in flight. The stage functions must be
+        picklable, i.e. defined at module level. Stages after the first
+        batch() or window() still run in this process.
+        """
+        return self._replace(workers=workers)
+
+    def _source_rows(self, fused):
+        """Return an iterator over the source rows with fused applied"""
+        if self._source is None:
+            where = list(self._where) or None
+            if self._workers is not None:
+                return chain.from_iterable(parallel_scan(
+                    self._batch_size, workers=self._workers, where=where,
+                    columns=self._columns, process=fused))
+            rows = chain.from_iterable(stream_users_in_batches(
+                self._batch_size, where=where, columns=self._columns))
+        elif self._workers is not None:
+            return self._parallel_rows(fused)
+        else:
+            rows = self._source
+        return fused.iterate(rows)
+
+    def _parallel_rows(self, fused):
+        """Yield the rows of an iterable source with fused applied in
+        worker processes"""
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            batches = _map_bounded(
+                executor, fused, _batches(self._source, self._batch_size),
+                self._workers * 2)
+            yield from chain.from_iterable(batches)
+
+    def __iter__(self):
+        stages = list(self._stages)
+        leading = []
+        while stages and stages[0][0] in _ROW_STAGES:
+            leading.append(stages.pop(0))
+        rows = self._source_rows(_Fused(leading))
+
+        while stages:
+            kind, argument = stages.pop(0)
+            if kind == 'batch':
+                rows = _batches(rows, argument)
+            elif kind == 'window':
+                rows = _windows(rows, *argument)
+            else:
+                fused = [(kind, argument)]
+                while stages and stages[0][0] in _ROW_STAGES:
+                    fused.append(stages.pop(0))
+                rows = _Fused(fused).iterate(rows)
+        return iter(rows)
+
+    def reduce(self, function, *initial):
+        """
+        Run the pipeline and fold its output with function(total, item).
+
+        Args:
+            function: Two-argument function combining the running total
+                with the next item
+            initial: Optional starting total; defaults to the first item
+
+        Returns:
+            The final total
+        """
+        return reduce(function, self, *initial)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Read-ahead for page and batch generators on a background thread
+"""
+
+import queue
+import threading
+
+_ITEM = 'item'
+_END = 'end'
+_ERROR = 'error'
+
+
+def prefetch(source, depth):
+    """
+    Generator that runs source on a background thread, keeping up to depth
+    items fetched ahead of the consumer.
+
+    While the consumer works on one page or batch, the thread is already
+    waiting on the database for the next ones, so query latency and
+    consumer CPU time overlap instead of adding up.
+
+    An exception raised by source is re-raised in the consumer at the
+    point it would have surfaced without read-ahead. If the consumer stops
+    early (break, close() or garbage collection), the thread is told to
+    stop, source is closed on that thread so its connection is released,
+    and the thread is joined before this generator finishes closing.
+
+    Args:
+        source: Iterator or generator producing pages or batches
+        depth (int): Maximum number of items fetched ahead; 0 disables
+            read-ahead and iterates source directly
+
+    Yields:
+        Items of source, in order
+    """
+    if depth <= 0:
+        yield from source
+        return
+
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(message):
+        while not stop.is_set():
+            try:
+                buffer.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in source:
+                if not put((_ITEM, item)):
+                    return
+            put((_END, None))
+        except BaseException as error:
+            put((_ERROR, error))
+        finally:
+            close = getattr(source, 'close', None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, name='prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            kind, value = buffer.get()
+            if kind == _END:
+                return
+            if kind == _ERROR:
+                raise value
+            yield value
+    finally:
+        stop.set()
+        thread.join()
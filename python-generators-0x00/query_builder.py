@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Compile declarative predicates and column projections into parameterized
+SELECT statements against user_data
+"""
+
+USER_COLUMNS = ('user_id', 'name', 'email', 'age')
+
+OPERATORS = ('=', '!=', '<', '<=', '>', '>=', 'IN', 'LIKE')
+
+
+def _check_column(column):
+    """Reject anything that is not a known user_data column"""
+    if column not in USER_COLUMNS:
+        raise ValueError(f"Unknown column: {column!r}")
+    return column
+
+
+def compile_where(where):
+    """
+    Compile a predicate into a WHERE clause and its parameters.
+
+    A predicate is a (column, operator, value) tuple, or a list of them
+    combined with AND. Column names and operators are checked against a
+    whitelist; values are always passed as query parameters.
+
+    Args:
+        where: A predicate tuple, a list of predicate tuples, or None
+
+    Returns:
+        tuple: (sql, params) where sql is '' when there is no predicate
+
+    Example:
+        >>> compile_where([('age', '>', 25), ('email', 'LIKE', '%@gmail.com')])
+        ('WHERE age > %s AND email LIKE %s', [25, '%@gmail.com'])
+    """
+    if not where:
+        return '', []
+    if isinstance(where, tuple):
+        where = [where]
+
+    clauses = []
+    params = []
+    for column, operator, value in where:
+        _check_column(column)
+        operator = operator.upper()
+        if operator not in OPERATORS:
+            raise ValueError(f"Unsupported operator: {operator!r}")
+        if operator == 'IN':
+            values = list(value)
+            if not values:
+                raise ValueError("IN requires at least one value")
+            placeholders = ', '.join(['%s'] * len(values))
+            clauses.append(f"{column} IN ({placeholders})")
+            params.extend(values)
+        else:
+            clauses.append(f"{column} {operator} %s")
+            params.append(value)
+    return 'WHERE ' + ' AND '.join(clauses), params
+
+
+def compile_columns(columns):
+    """
+    Compile a column projection into a SELECT list.
+
+    Args:
+        columns (sequence): Column names, or None for every column
+
+    Returns:
+        str: The SELECT list
+    """
+    if not columns:
+        return '*'
+    return ', '.join(_check_column(column) for column in columns)
+
+
+def build_select(columns=None, where=None, order_by=None, table='user_data'):
+    """
+    Build a parameterized SELECT statement.
+
+    Args:
+        columns (sequence): Columns to select, or None for every column
+        where: Predicate accepted by compile_where
+        order_by (str): Column to order by, or None
+        table (str): Table to select from
+
+    Returns:
+        tuple: (sql, params)
+    """
+    where_sql, params = compile_where(where)
+    parts = [f"SELECT {compile_columns(columns)} FROM {table}"]
+    if where_sql:
+        parts.append(where_sql)
+    if order_by:
+        parts.append(f"ORDER BY {_check_column(order_by)}")
+    return ' '.join(parts), params
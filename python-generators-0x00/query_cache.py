@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+In-process cache of query results for the ALX_prodev database
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import seed
+
+
+class CacheStats:
+    """
+    Counters describing how the cache has been used.
+
+    Attributes:
+        hits (int): Lookups served from the cache
+        misses (int): Lookups that had to run the query
+        evictions (int): Entries dropped to stay within max_bytes
+        expirations (int): Entries dropped for being older than the TTL
+        invalidations (int): Times the whole cache was invalidated
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def hit_rate(self):
+        """float: Fraction of lookups served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self):
+        """Return the counters as a plain dictionary"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
+
+
+def estimate_size(rows):
+    """
+    Estimate the memory held by a list of result rows, in bytes.
+
+    Counts the list, each row and each value; values shared between rows
+    (small ints, interned strings) are counted every time, so this errs
+    on the high side.
+    """
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        values = row.values() if isinstance(row, dict) else row
+        for value in values:
+            size += sys.getsizeof(value)
+    return size
+
+
+class QueryCache:
+    """
+    LRU cache of query results keyed by (query, params).
+
+    The cache holds at most max_bytes of results, as measured by
+    estimate_size, evicting the least recently used entries first.
+    Entries older than ttl seconds are treated as missing. invalidate()
+    drops everything; it is registered with seed.on_data_changed so
+    writes made through seed.insert_data are visible on the next lookup.
+
+    Args:
+        max_bytes (int): Upper bound on the cached result size
+        ttl (float): Seconds an entry stays valid, or None for no expiry
+        clock: Function returning the current time in seconds
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, ttl=60.0,
+                 clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """int: Estimated bytes held by the cached results"""
+        return self._bytes
+
+    def _discard(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, query, params, load):
+        """
+        Return the rows for (query, params), calling load() on a miss.
+
+        Args:
+            query (str): SQL text
+            params (tuple): Query parameters
+            load: Function running the query and returning its rows
+
+        Returns:
+            list: The result rows; callers must not modify them
+        """
+        key = (query, tuple(params))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                rows, _, stored_at = entry
+                if self.ttl is None or self._clock() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return rows
+                self._discard(key)
+                self.stats.expirations += 1
+            self.stats.misses += 1
+            generation = self.stats.invalidations
+
+        rows = load()
+        self.put(key, rows, generation)
+        return rows
+
+    def put(self, key, rows, generation=None):
+        """
+        Store rows under key, evicting older entries to make room.
+
+        Results loaded before an invalidation (generation no longer
+        current) are not stored, so a slow query cannot reinsert stale
+        rows after the data changed.
+        """
+        size = estimate_size(rows)
+        with self._lock:
+            if generation is not None \
+                    and generation != self.stats.invalidations:
+                return
+            if size > self.max_bytes:
+                return
+            if key in self._entries:
+                self._discard(key)
+            while self._bytes + size > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.stats.evictions += 1
+            self._entries[key] = (rows, size, self._clock())
+            self._bytes += size
+
+    def invalidate(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.stats.invalidations += 1
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Return the process-wide cache, creating it on first use.
+
+    Sizing is read from the environment loaded by seed.py:
+    QUERY_CACHE_BYTES and QUERY_CACHE_TTL (seconds, 0 disables expiry).
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            ttl = float(os.getenv('QUERY_CACHE_TTL', '60'))
+            _cache = QueryCache(
+                max_bytes=int(os.getenv('QUERY_CACHE_BYTES',
+                                        str(16 * 1024 * 1024))),
+                ttl=ttl or None,
+            )
+            seed.on_data_changed(_cache.invalidate)
+        return _cache
+
+
+def cached_query(query, params, load):
+    """Return the rows for (query, params) from the shared cache"""
+    return get_cache().get(query, params, load)
+
+
+def invalidate():
+    """Drop every result held by the shared cache"""
+    get_cache().invalidate()
+
+
+def cache_stats():
+    """Return the shared cache's counters as a dictionary"""
+    cache = get_cache()
+    stats = cache.stats.as_dict()
+    stats['entries'] = len(cache)
+    stats['bytes'] = cache.size
+    return stats
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Compact representations of user_data rows and batches
+"""
+
+import operator
+from array import array
+from collections.abc import Mapping, Sequence
+from itertools import compress
+
+from query_builder import USER_COLUMNS
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+ROW_FORMATS = ('dict', 'row', 'columnar', 'arrays')
+
+COMPARISONS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+class UserRow(Mapping):
+    """
+    A user_data row stored in __slots__ instead of a per-row dict.
+
+    It is a read-only Mapping, so dict-style consumers (user['age'],
+    user.get('email'), dict(user)) keep working, while each row takes a
+    fraction of the memory of a four-key dict. Fields are also available
+    as attributes (user.age). str() matches the dict format printed by
+    the dictionary-cursor generators.
+    """
+
+    __slots__ = USER_COLUMNS
+
+    def __init__(self, user_id, name, email, age):
+        self.user_id = user_id
+        self.name = name
+        self.email = email
+        self.age = age
+
+    def __getitem__(self, key):
+        if key not in USER_COLUMNS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(USER_COLUMNS)
+
+    def __len__(self):
+        return len(USER_COLUMNS)
+
+    def __repr__(self):
+        return (f"UserRow(user_id={self.user_id!r}, name={self.name!r}, "
+                f"email={self.email!r}, age={self.age!r})")
+
+    def __str__(self):
+        return str(self.as_dict())
+
+    def as_dict(self):
+        """Return the row as a plain dictionary"""
+        return {column: getattr(self, column) for column in USER_COLUMNS}
+
+
+class UserBatch(Sequence):
+    """
+    A column-oriented batch of user_data rows.
+
+    Strings are kept in one list per column and ages in an unsigned
+    16-bit array (age is DECIMAL(3,0), so up to 999). Indexing or
+    iterating yields UserRow objects built on demand, so code written
+    against a list of dicts still works.
+    """
+
+    def __init__(self, user_ids, names, emails, ages):
+        self.user_ids = user_ids
+        self.names = names
+        self.emails = emails
+        self.ages = ages
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a batch from (user_id, name, email, age) tuples"""
+        if not rows:
+            return cls([], [], [], array('H'))
+        user_ids, names, emails, ages = zip(*rows)
+        return cls(list(user_ids), list(names), list(emails),
+                   array('H', map(int, ages)))
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return UserBatch(self.user_ids[index], self.names[index],
+                             self.emails[index], self.ages[index])
+        return UserRow(self.user_ids[index], self.names[index],
+                       self.emails[index], self.ages[index])
+
+    def __iter__(self):
+        return map(UserRow, self.user_ids, self.names, self.emails,
+                   self.ages)
+
+    def __repr__(self):
+        return f"<UserBatch of {len(self)} rows>"
+
+    def columns(self):
+        """Return the batch as a {column: values} dictionary"""
+        return {
+            'user_id': self.user_ids,
+            'name': self.names,
+            'email': self.emails,
+            'age': self.ages,
+        }
+
+
+class ColumnarBatch(Sequence):
+    """
+    A struct-of-arrays batch for vectorized analytics.
+
+    With NumPy installed each column is a preallocated ndarray: object
+    arrays for the string columns and uint16 for age. Without NumPy, age
+    is an array('H') and the string columns are lists. Filters are mask
+    operations over whole columns, e.g. batch.filter(batch.age > 25) with
+    NumPy, or batch.where('age', '>', 25) with either backend.
+    """
+
+    def __init__(self, user_id, name, email, age):
+        self.user_id = user_id
+        self.name = name
+        self.email = email
+        self.age = age
+
+    @classmethod
+    def allocate(cls, capacity):
+        """Preallocate empty column buffers for capacity rows"""
+        if np is not None:
+            return cls(np.empty(capacity, dtype=object),
+                       np.empty(capacity, dtype=object),
+                       np.empty(capacity, dtype=object),
+                       np.empty(capacity, dtype=np.uint16))
+        return cls([''] * capacity, [''] * capacity, [''] * capacity,
+                   array('H', bytes(2 * capacity)))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Fill a preallocated batch from (user_id, name, email, age) tuples
+        as returned by fetchmany, one column at a time and without
+        building per-row objects.
+        """
+        count = len(rows)
+        batch = cls.allocate(count)
+        if not count:
+            return batch
+        ages = map(int, map(operator.itemgetter(3), rows))
+        if np is not None:
+            batch.age[:] = np.fromiter(ages, dtype=np.uint16, count=count)
+        else:
+            batch.age = array('H', ages)
+        for index, column in enumerate(('user_id', 'name', 'email')):
+            values = list(map(operator.itemgetter(index), rows))
+            if np is not None:
+                getattr(batch, column)[:] = values
+            else:
+                setattr(batch, column, values)
+        return batch
+
+    def __len__(self):
+        return len(self.age)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ColumnarBatch(self.user_id[index], self.name[index],
+                                 self.email[index], self.age[index])
+        return UserRow(str(self.user_id[index]), self.name[index],
+                       self.email[index], int(self.age[index]))
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    def __repr__(self):
+        backend = 'numpy' if np is not None else 'array'
+        return f"<ColumnarBatch of {len(self)} rows ({backend})>"
+
+    def compare(self, column, operator_symbol, value):
+        """
+        Compare a whole column against a value.
+
+        Returns:
+            A boolean mask: an ndarray with NumPy, otherwise a list
+        """
+        if column not in USER_COLUMNS:
+            raise KeyError(column)
+        comparison = COMPARISONS[operator_symbol]
+        values = getattr(self, column)
+        if np is not None:
+            return comparison(values, value)
+        return [comparison(item, value) for item in values]
+
+    def filter(self, mask):
+        """Return a new batch holding the rows where mask is true"""
+        if np is not None:
+            mask = np.asarray(mask, dtype=bool)
+            return ColumnarBatch(self.user_id[mask], self.name[mask],
+                                 self.email[mask], self.age[mask])
+        return ColumnarBatch(list(compress(self.user_id, mask)),
+                             list(compress(self.name, mask)),
+                             list(compress(self.email, mask)),
+                             array('H', compress(self.age, mask)))
+
+    def where(self, column, operator_symbol, value):
+        """Shorthand for filter(compare(column, operator_symbol, value))"""
+        return self.filter(self.compare(column, operator_symbol, value))
+
+    def columns(self):
+        """Return the batch as a {column: values} dictionary"""
+        return {column: getattr(self, column) for column in USER_COLUMNS}
+
+
+def check_row_format(row_format, columns=None):
+    """
+    Validate a row_format argument.
+
+    The compact formats always carry every user_data column, so they
+    cannot be combined with a column projection.
+    """
+    if row_format not in ROW_FORMATS:
+        raise ValueError(f"row_format must be one of {ROW_FORMATS}")
+    if row_format != 'dict' and columns:
+        raise ValueError(f"row_format {row_format!r} needs every column")
+
+
+def to_user_row(row):
+    """Build a UserRow from a (user_id, name, email, age) tuple"""
+    user_id, name, email, age = row
+    return UserRow(user_id, name, email, int(age))
+
+
+def convert_batch(rows, row_format):
+    """
+    Convert (user_id, name, email, age) tuples to the requested format.
+
+    Args:
+        rows (list): Tuples as fetched by a plain cursor
+        row_format (str): 'row' for a list of UserRow, 'columnar' for a
+            UserBatch, 'arrays' for a ColumnarBatch
+
+    Returns:
+        list, UserBatch or ColumnarBatch: The converted batch
+    """
+    if row_format == 'columnar':
+        return UserBatch.from_rows(rows)
+    if row_format == 'arrays':
+        return ColumnarBatch.from_rows(rows)
+    return [to_user_row(row) for row in rows]
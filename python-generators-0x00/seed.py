@@ -1,28 +1,44 @@
 #!/usr/bin/env python3
 """
-Seed script to set up MySQL database and populate with user data
+Seed script to set up the database and populate with user data.
+
+MySQL is used by default; set DB_BACKEND=sqlite to use an embedded SQLite
+file instead (see backends.py).
 """
 
-import mysql.connector
-import csv
-import uuid
-import os
-from mysql.connector import Error
+import sys
 from dotenv import load_dotenv
 
+import bulk_loader
+import csv_pipeline
+from backends import INDEXES, REDUNDANT_INDEXES, Error, get_backend
+from query_builder import build_select
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Callbacks run after insert_data writes to user_data
+_data_changed_hooks = []
+
+
+def on_data_changed(callback):
+    """
+    Registers callback to be called with no arguments whenever
+    insert_data has written to user_data, e.g. to invalidate caches.
+    """
+    _data_changed_hooks.append(callback)
+    return callback
+
+
+def _notify_data_changed():
+    for callback in _data_changed_hooks:
+        callback()
+
 
 def connect_db():
     """Connects to the MySQL database server"""
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASSWORD', '')
-        )
-        return connection
+        return get_backend().connect_server()
     except Error as e:
         print(f"Error connecting to MySQL: {e}")
         return None
@@ -31,91 +47,207 @@ def connect_db():
 def create_database(connection):
     """Creates the database ALX_prodev if it does not exist"""
     try:
-        cursor = connection.cursor()
-        cursor.execute("CREATE DATABASE IF NOT EXISTS ALX_prodev")
-        cursor.close()
+        get_backend().create_database(connection)
         print("Database ALX_prodev created successfully")
     except Error as e:
         print(f"Error creating database: {e}")
 
 
-def connect_to_prodev():
-    """Connects to the ALX_prodev database in MySQL"""
+def connect_to_prodev(allow_local_infile=False):
+    """Connects to the ALX_prodev database"""
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASSWORD', ''),
-            database=os.getenv('DB_NAME', 'ALX_prodev')
-        )
-        return connection
+        return get_backend().connect(allow_local_infile=allow_local_infile)
     except Error as e:
         print(f"Error connecting to ALX_prodev database: {e}")
         return None
 
 
 def create_table(connection):
-    """Creates a table user_data if it does not exist with the required fields"""
+    """
+    Creates a table user_data if it does not exist with the required fields.
+
+    Indexes are synced here only when the table already holds rows; an
+    empty table gets them from insert_data, built once after the load.
+    """
     try:
+        get_backend().create_table(connection)
+        print("Table user_data created successfully")
         cursor = connection.cursor()
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS user_data (
-            user_id CHAR(36) PRIMARY KEY,
-            name VARCHAR(255) NOT NULL,
-            email VARCHAR(255) NOT NULL,
-            age DECIMAL(3,0) NOT NULL,
-            INDEX idx_user_id (user_id)
-        )
-        """
-        cursor.execute(create_table_query)
+        cursor.execute("SELECT 1 FROM user_data LIMIT 1")
+        populated = cursor.fetchone() is not None
         cursor.close()
-        print("Table user_data created successfully")
+        if populated:
+            sync_indexes(connection)
     except Error as e:
         print(f"Error creating table: {e}")
 
 
-def insert_data(connection, csv_file):
-    """Inserts data in the database if it does not exist"""
+def sync_indexes(connection):
+    """
+    Brings the secondary indexes on user_data in line with INDEXES.
+
+    Redundant indexes left by earlier versions are dropped and missing
+    ones are created; indexes already in place are left alone.
+
+    Returns:
+        tuple: Names of the (created, dropped) indexes
+    """
+    backend = get_backend()
+    existing = backend.index_names(connection)
+    dropped = [name for name in REDUNDANT_INDEXES if name in existing]
+    for name in dropped:
+        backend.drop_index(connection, name)
+    created = [name for name in INDEXES if name not in existing]
+    for name in created:
+        backend.create_index(connection, name, INDEXES[name])
+    connection.commit()
+    for name in dropped:
+        print(f"Dropped redundant index {name}")
+    for name in created:
+        print(f"Created index {name} ({', '.join(INDEXES[name])})")
+    return created, dropped
+
+
+def drop_indexes(connection):
+    """
+    Drops the secondary indexes in INDEXES so a bulk load does not have
+    to maintain them row by row; sync_indexes rebuilds them afterwards.
+    """
+    backend = get_backend()
+    existing = backend.index_names(connection)
+    for name in INDEXES:
+        if name in existing:
+            backend.drop_index(connection, name)
+    connection.commit()
+
+
+def generator_queries():
+    """
+    Returns the queries issued by the generator scripts.
+
+    Returns:
+        list: (generator, query, params) tuples
+    """
+    lazy_paginate = __import__('2-lazy_paginate')
+    batch_query, batch_params = build_select(where=('age', '>', 25))
+    return [
+        ('stream_users', build_select()[0], ()),
+        ('batch_processing', batch_query, tuple(batch_params)),
+        ('lazy_pagination', lazy_paginate.OFFSET_PAGE_QUERY, (100, 0)),
+        ('lazy_pagination(keyset=True)', lazy_paginate.KEYSET_PAGE_QUERY,
+         ('', 100)),
+        ('stream_user_ages', "SELECT age FROM user_data", ()),
+        ('aggregate_ages percentile',
+         "SELECT age FROM user_data ORDER BY age LIMIT 1 OFFSET %s", (0,)),
+    ]
+
+
+def explain_queries(connection):
+    """
+    Prints the EXPLAIN plan of each generator's query.
+
+    Returns:
+        dict: Plan rows keyed by generator name
+    """
+    backend = get_backend()
+    plans = {}
+    for name, query, params in generator_queries():
+        try:
+            plans[name] = backend.explain(connection, query, params)
+        except Error as e:
+            print(f"Error explaining {name}: {e}")
+            continue
+        print(f"{name}: {' '.join(query.split())}")
+        for step in plans[name]:
+            print("    " + ", ".join(f"{key}={value}"
+                                     for key, value in step.items()
+                                     if value is not None))
+    return plans
+
+
+def insert_data(connection, csv_file,
+                chunk_size=bulk_loader.DEFAULT_CHUNK_SIZE,
+                use_load_data=False, incremental=False, workers=0):
+    """
+    Inserts data in the database if it does not exist.
+
+    The CSV is streamed in chunks of chunk_size rows, each committed on
+    its own, so memory stays bounded and an interrupted load resumes
+    after the last committed chunk when run again. With use_load_data
+    the file is loaded by LOAD DATA LOCAL INFILE instead; the connection
+    must then come from connect_to_prodev(allow_local_infile=True).
+
+    With workers, reading, parsing and inserting run as a pipeline with
+    CSV parsing spread over that many processes (see csv_pipeline), and
+    per-stage throughput is printed.
+
+    With incremental, the table is instead synced to the CSV: rows are
+    keyed by email, unchanged rows are skipped, new or changed rows are
+    upserted and rows missing from the CSV are deleted.
+
+    Callbacks registered with on_data_changed run once the data has been
+    written, so caches of user_data never serve rows from before the load.
+
+    A full load drops the secondary indexes first and rebuilds them once
+    the rows are in, which is much faster than updating them per row.
+    They are rebuilt even when the load fails, and are created here for a
+    table create_table left without them.
+    """
+    backend = get_backend()
+    written = False
     try:
+        if incremental:
+            sync_indexes(connection)
+            written = True
+            with backend.bulk_load(connection):
+                report = bulk_loader.sync_csv(
+                    connection, csv_file, chunk_size,
+                    upsert_query=backend.upsert_query)
+            print(f"Synced user_data: {report}")
+            return
+
         cursor = connection.cursor()
-        
-        # Check if data already exists
+
+        # Check if data already exists, unless a partial load is resuming
         cursor.execute("SELECT COUNT(*) FROM user_data")
         count = cursor.fetchone()[0]
-        
-        if count > 0:
+        cursor.close()
+
+        resuming = bulk_loader.read_checkpoint(connection, csv_file) > 0
+        if count > 0 and not resuming:
             print("Data already exists in the table")
-            cursor.close()
             return
-        
-        # Read CSV file and insert data
-        with open(csv_file, 'r', newline='', encoding='utf-8') as file:
-            csv_reader = csv.DictReader(file)
-            
-            insert_query = """
-            INSERT INTO user_data (user_id, name, email, age)
-            VALUES (%s, %s, %s, %s)
-            """
-            
-            data_to_insert = []
-            for row in csv_reader:
-                user_id = str(uuid.uuid4())
-                name = row['name']
-                email = row['email']
-                age = int(row['age'])
-                data_to_insert.append((user_id, name, email, age))
-            
-            cursor.executemany(insert_query, data_to_insert)
-            connection.commit()
-            print(f"Inserted {len(data_to_insert)} rows into user_data table")
-        
-        cursor.close()
+
+        written = True
+        drop_indexes(connection)
+        with backend.bulk_load(connection):
+            if use_load_data and backend.supports_load_data \
+                    and not resuming:
+                report = bulk_loader.load_data_infile(connection, csv_file)
+            elif workers:
+                report = csv_pipeline.pipelined_load(connection, csv_file,
+                                                     workers=workers)
+            else:
+                report = bulk_loader.load_csv(connection, csv_file,
+                                              chunk_size)
+        if report.skipped:
+            print(f"Resumed after {report.skipped} previously loaded rows")
+        print(f"Inserted {report}")
     except Error as e:
         print(f"Error inserting data: {e}")
     except FileNotFoundError:
         print(f"CSV file {csv_file} not found")
     except Exception as e:
         print(f"Unexpected error: {e}")
+    finally:
+        if not incremental:
+            try:
+                sync_indexes(connection)
+            except Error as e:
+                print(f"Error rebuilding indexes: {e}")
+        # Chunks committed before a failure are visible too
+        if written:
+            _notify_data_changed()
 
 
 def main():
@@ -137,9 +269,13 @@ def main():
     # Create table
     create_table(connection)
     
-    # Insert data from CSV file
+    # Insert data from CSV file; --sync refreshes an existing table
     csv_file = 'user_data.csv'
-    insert_data(connection, csv_file)
+    insert_data(connection, csv_file, incremental='--sync' in sys.argv[1:])
+
+    # Show how the generator queries use the indexes
+    if '--explain' in sys.argv[1:]:
+        explain_queries(connection)
     
     connection.close()
     print("Database setup completed successfully!")
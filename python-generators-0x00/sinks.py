@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Buffered output sinks for batches of user records
+"""
+
+import csv
+import io
+import json
+import sys
+from decimal import Decimal
+
+
+def _json_default(value):
+    """Serialize the DECIMAL age column and compact rows"""
+    if hasattr(value, 'as_dict'):
+        return value.as_dict()
+    if isinstance(value, Decimal):
+        if value == value.to_integral_value():
+            return int(value)
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class Sink:
+    """
+    Base class for buffered sinks.
+
+    Rows passed to write_batch() are formatted into an in-memory buffer
+    and written to the underlying stream with a single write on flush(),
+    instead of one write per row.
+
+    Args:
+        stream: Text stream to write to
+        close_stream (bool): Close the stream when the sink is closed
+    """
+
+    def __init__(self, stream, close_stream=False):
+        self.stream = stream
+        self.close_stream = close_stream
+        self.rows_written = 0
+        self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def format_rows(self, rows):
+        """Return the text for a batch of rows"""
+        raise NotImplementedError
+
+    def write_batch(self, rows):
+        """Format a batch of rows into the buffer"""
+        if rows:
+            self._buffer.append(self.format_rows(rows))
+            self.rows_written += len(rows)
+
+    def flush(self):
+        """Write everything buffered so far with a single write"""
+        if self._buffer:
+            self.stream.write(''.join(self._buffer))
+            self._buffer = []
+        self.stream.flush()
+
+    def close(self):
+        """Flush the buffer and release the stream if the sink owns it"""
+        self.flush()
+        if self.close_stream:
+            self.stream.close()
+
+
+class StdoutSink(Sink):
+    """Writes one row per line in the same format as print(row)"""
+
+    def __init__(self, stream=None):
+        super().__init__(stream if stream is not None else sys.stdout)
+
+    def format_rows(self, rows):
+        return '\n'.join(map(str, rows)) + '\n'
+
+
+class FileSink(StdoutSink):
+    """
+    Writes one row per line in the same format as print(row) to a file.
+
+    Args:
+        path (str): File to write, truncated on open
+    """
+
+    def __init__(self, path):
+        super().__init__(open(path, 'w', encoding='utf-8'))
+        self.close_stream = True
+
+
+class JsonLinesSink(Sink):
+    """
+    Writes one JSON object per line.
+
+    Args:
+        path (str): File to write, or None for stdout
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            super().__init__(sys.stdout)
+        else:
+            super().__init__(open(path, 'w', encoding='utf-8'),
+                             close_stream=True)
+        self._encoder = json.JSONEncoder(default=_json_default)
+
+    def format_rows(self, rows):
+        encode = self._encoder.encode
+        return '\n'.join(encode(row) for row in rows) + '\n'
+
+
+class CsvSink(Sink):
+    """
+    Writes rows as CSV with a header taken from the first row.
+
+    Args:
+        path (str): File to write, or None for stdout
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            super().__init__(sys.stdout)
+        else:
+            super().__init__(open(path, 'w', newline='', encoding='utf-8'),
+                             close_stream=True)
+        self._fieldnames = None
+
+    def format_rows(self, rows):
+        text = io.StringIO()
+        if self._fieldnames is None:
+            self._fieldnames = list(rows[0].keys())
+            header = True
+        else:
+            header = False
+        writer = csv.DictWriter(text, fieldnames=self._fieldnames)
+        if header:
+            writer.writeheader()
+        writer.writerows(rows)
+        return text.getvalue()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Mergeable single-pass statistics for streams of numbers
+"""
+
+import math
+
+
+class RunningMoments:
+    """
+    Count, mean, variance, min and max using Welford's online algorithm.
+
+    Two accumulators built over disjoint parts of a stream can be combined
+    with merge(), so shards or workers can each scan part of the data.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, value):
+        """Add one value"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Fold another RunningMoments into this one (Chan et al.)"""
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """float: Population variance"""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def sample_variance(self):
+        """float: Unbiased sample variance"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self):
+        """float: Population standard deviation"""
+        return math.sqrt(self.variance)
+
+
+class Histogram:
+    """
+    Fixed-width bucket histogram over [lower, upper).
+
+    Values outside the range are counted in underflow/overflow. Histograms
+    with the same bounds and bucket count can be merged.
+
+    Args:
+        lower (float): Inclusive lower bound of the first bucket
+        upper (float): Exclusive upper bound of the last bucket
+        buckets (int): Number of equal-width buckets
+    """
+
+    def __init__(self, lower, upper, buckets):
+        if upper <= lower or buckets < 1:
+            raise ValueError("Histogram needs upper > lower and buckets >= 1")
+        self.lower = lower
+        self.upper = upper
+        self.width = (upper - lower) / buckets
+        self.counts = [0] * buckets
+        self.underflow = 0
+        self.overflow = 0
+
+    def update(self, value):
+        """Count one value"""
+        if value < self.lower:
+            self.underflow += 1
+        elif value >= self.upper:
+            self.overflow += 1
+        else:
+            index = int((value - self.lower) / self.width)
+            self.counts[min(index, len(self.counts) - 1)] += 1
+
+    def merge(self, other):
+        """Add another histogram's counts to this one"""
+        if (other.lower, other.upper, len(other.counts)) != \
+                (self.lower, self.upper, len(self.counts)):
+            raise ValueError("Cannot merge histograms with different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def buckets(self):
+        """Return (bucket_lower, bucket_upper, count) for every bucket"""
+        return [
+            (self.lower + i * self.width, self.lower + (i + 1) * self.width,
+             count)
+            for i, count in enumerate(self.counts)
+        ]
+
+
+class TDigest:
+    """
+    A merging t-digest sketch for approximate quantiles.
+
+    Values are buffered and periodically compressed into weighted
+    centroids whose size is bounded by the arcsine scale function, giving
+    accurate tails with O(compression) memory. Digests merge by
+    re-compressing the union of their centroids.
+
+    Args:
+        compression (int): Accuracy/size trade-off; roughly the maximum
+            number of centroids kept
+    """
+
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._centroids = []
+        self._buffer = []
+        self._buffer_limit = compression * 5
+
+    def update(self, value, weight=1):
+        """Add a value with the given weight"""
+        self._buffer.append((value, weight))
+        self.count += weight
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        if len(self._buffer) >= self._buffer_limit:
+            self._compress()
+
+    def merge(self, other):
+        """Fold another digest into this one"""
+        other._compress()
+        if not other.count:
+            return self
+        self._buffer.extend(other._centroids)
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inverse(self, k):
+        return (math.sin(2 * math.pi * k / self.compression) + 1) / 2
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(self._centroids + self._buffer)
+        self._buffer = []
+        total = self.count
+
+        merged = []
+        mean, weight = points[0]
+        weight_before = 0
+        q_limit = self._k_inverse(self._k(0) + 1)
+        for value, value_weight in points[1:]:
+            if (weight_before + weight + value_weight) / total <= q_limit:
+                weight += value_weight
+                mean += (value - mean) * value_weight / weight
+            else:
+                merged.append((mean, weight))
+                weight_before += weight
+                q_limit = self._k_inverse(
+                    min(self._k(weight_before / total) + 1,
+                        self.compression / 4))
+                mean, weight = value, value_weight
+        merged.append((mean, weight))
+        self._centroids = merged
+
+    def quantile(self, q):
+        """
+        Estimate the q-th quantile.
+
+        Args:
+            q (float): Quantile in [0, 1]
+
+        Returns:
+            float: Estimated value, or None if the digest is empty
+        """
+        self._compress()
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        target = q * self.count
+        centroids = self._centroids
+        cumulative = 0
+        previous_center = 0
+        previous_mean = self.min
+        for mean, weight in centroids:
+            center = cumulative + weight / 2
+            if target < center:
+                span = center - previous_center
+                fraction = (target - previous_center) / span if span else 0
+                return previous_mean + fraction * (mean - previous_mean)
+            cumulative += weight
+            previous_center, previous_mean = center, mean
+
+        span = self.count - previous_center
+        fraction = (target - previous_center) / span if span else 0
+        return previous_mean + fraction * (self.max - previous_mean)
+
+
+class StreamingStatistics:
+    """
+    One-pass mean, variance, min/max, histogram and quantiles.
+
+    Args:
+        lower (float): Lower bound of the histogram
+        upper (float): Upper bound of the histogram
+        buckets (int): Number of histogram buckets
+        compression (int): t-digest compression
+    """
+
+    def __init__(self, lower=0, upper=100, buckets=10, compression=100):
+        self.moments = RunningMoments()
+        self.histogram = Histogram(lower, upper, buckets)
+        self.digest = TDigest(compression)
+
+    def update(self, value):
+        """Add one value to every statistic"""
+        self.moments.update(value)
+        self.histogram.update(value)
+        self.digest.update(value)
+
+    def update_many(self, values):
+        """Add every value from an iterable"""
+        for value in values:
+            self.update(value)
+        return self
+
+    def merge(self, other):
+        """Fold statistics computed over another shard into this one"""
+        self.moments.merge(other.moments)
+        self.histogram.merge(other.histogram)
+        self.digest.merge(other.digest)
+        return self
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99)):
+        """
+        Return the statistics as a dictionary.
+
+        Args:
+            quantiles (sequence): Quantiles in [0, 1] to estimate
+        """
+        return {
+            'count': self.moments.count,
+            'mean': self.moments.mean,
+            'variance': self.moments.variance,
+            'stddev': self.moments.stddev,
+            'min': self.moments.min,
+            'max': self.moments.max,
+            'histogram': self.histogram.buckets(),
+            'underflow': self.histogram.underflow,
+            'overflow': self.histogram.overflow,
+            'quantiles': {q: self.digest.quantile(q) for q in quantiles},
+        }
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Unit tests for async_streams on the aiosqlite backend"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import aclosing
+from unittest.mock import patch
+
+import async_streams
+
+
+class RecordingConnection(async_streams._SQLiteConnection):
+    """_SQLiteConnection that records when its cursors and it close"""
+
+    events = []
+
+    async def batches(self, query, params, size, dictionary=True):
+        try:
+            async with aclosing(super().batches(query, params, size,
+                                                dictionary)) as batches:
+                async for rows in batches:
+                    yield rows
+        finally:
+            self.events.append('cursor closed')
+
+    async def close(self):
+        self.events.append('connection closed')
+        await super().close()
+
+
+class TestEarlyBreak(unittest.IsolatedAsyncioTestCase):
+    """Breaking out of a scan closes its cursor before its connection"""
+
+    def setUp(self):
+        """Create a small user_data table and point the module at it"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'users.db')
+        with sqlite3.connect(path) as connection:
+            connection.execute(
+                "CREATE TABLE user_data (user_id TEXT PRIMARY KEY, "
+                "name TEXT, email TEXT, age INTEGER)")
+            connection.executemany(
+                "INSERT INTO user_data VALUES (?, ?, ?, ?)",
+                [(f"{i:04d}", f"user{i}", f"user{i}@example.com", 20 + i)
+                 for i in range(50)])
+        connection.close()
+
+        env = patch.dict(os.environ, {'DB_BACKEND': 'sqlite',
+                                      'DB_PATH': path})
+        env.start()
+        self.addCleanup(env.stop)
+        connection_class = patch.object(async_streams, '_SQLiteConnection',
+                                        RecordingConnection)
+        connection_class.start()
+        self.addCleanup(connection_class.stop)
+        RecordingConnection.events = []
+
+    async def test_astream_users_in_batches(self):
+        """Test closing a batch stream after its first batch"""
+        stream = async_streams.astream_users_in_batches(10)
+        async for batch in stream:
+            self.assertEqual(len(batch), 10)
+            break
+        await stream.aclose()
+        self.assertEqual(RecordingConnection.events,
+                         ['cursor closed', 'connection closed'])
+
+    async def test_astream_users(self):
+        """Test closing a row stream after its first row"""
+        stream = async_streams.astream_users(fetch_size=10)
+        async for user in stream:
+            self.assertEqual(user['user_id'], '0000')
+            break
+        await stream.aclose()
+        self.assertEqual(RecordingConnection.events,
+                         ['cursor closed', 'connection closed'])
+
+    async def test_astream_user_ages(self):
+        """Test closing the age stream after its first age"""
+        stream = async_streams.astream_user_ages(fetch_size=10)
+        async for age in stream:
+            self.assertEqual(age, 20)
+            break
+        await stream.aclose()
+        self.assertEqual(RecordingConnection.events,
+                         ['cursor closed', 'connection closed'])
+
+
+if __name__ == '__main__':
+    unittest.main()